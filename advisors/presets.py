@@ -1,6 +1,9 @@
 """Domain-specific advisor presets shared across the app and CLI entry points."""
 
-from typing import Dict, List
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+from advisors.prompts import ACTIONABILITY_RULE, ADVICE_RULE
 
 CATEGORY_PRESETS: Dict[str, Dict] = {
     "Medical": {
@@ -75,3 +78,31 @@ CATEGORY_EMOJI: Dict[str, str] = {
 CATEGORY_SUBTITLE: Dict[str, str] = {
     "Medical": "Attending physician leading a multidisciplinary discussion to form a safe, guideline-aware diagnostic and treatment plan.",
 }
+
+
+@dataclass(frozen=True, slots=True)
+class CategoryMeta:
+    """Everything the UI and CLI need for one category, resolved once at import."""
+
+    emoji: str
+    subtitle: str
+    placeholder: str
+    # Agenda questions, and agenda rules with the shared actionability/advice rules appended
+    questions: Tuple[str, ...]
+    rules: Tuple[str, ...]
+    preset: Dict
+
+
+CATEGORY_META: Dict[str, CategoryMeta] = {
+    category: CategoryMeta(
+        emoji=CATEGORY_EMOJI.get(category, "🩺"),
+        subtitle=CATEGORY_SUBTITLE.get(
+            category, "Leader‑led expert panel tailored to the domain to deliver a clear, actionable plan."
+        ),
+        placeholder=CATEGORY_AGENDA_PLACEHOLDER.get(category, "Describe your case..."),
+        questions=tuple(CATEGORY_QUESTIONS.get(category, [])),
+        rules=(*CATEGORY_RULES.get(category, []), ACTIONABILITY_RULE, ADVICE_RULE),
+        preset=preset,
+    )
+    for category, preset in CATEGORY_PRESETS.items()
+}
@@ -0,0 +1,18 @@
+"""Helpers for writing meeting artifacts (transcripts, message logs) to disk."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Write ``data`` to ``path`` so readers see either the old file or the new one.
+
+    The bytes go to a sibling temp file that is then renamed over the target, so
+    a transcript tab or another session never reads a half-written artifact.
+    """
+
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
@@ -0,0 +1,66 @@
+"""Typed schema for the lead's consensus and its markdown rendering."""
+
+from __future__ import annotations
+
+from typing import List
+
+from pydantic import BaseModel
+
+
+class Option(BaseModel):
+    option: str
+    pros: List[str]
+    cons: List[str]
+
+
+class Action(BaseModel):
+    action: str
+    owner: str
+    deadline: str
+    steps: List[str]
+    tools: List[str]
+    success_metric: str
+    risk_mitigation: str
+
+
+class RiskMitigation(BaseModel):
+    risk: str
+    mitigation: str
+
+
+class Consensus(BaseModel):
+    assumptions: List[str]
+    options: List[Option]
+    recommendation: List[Action]
+    risks: List[RiskMitigation]
+    next_steps: List[str]
+
+
+def _bullets(items: List[str]) -> str:
+    return "\n".join(f"- {item}" for item in items) or "- (none)"
+
+
+def render_consensus_markdown(consensus: Consensus) -> str:
+    """Render ``consensus`` under the same headings the free-form lead prompt asks for."""
+
+    parts = ["## Assumptions", _bullets(consensus.assumptions), "## Options (pros/cons)"]
+    for opt in consensus.options:
+        parts.append(
+            f"**{opt.option}**\n- Pros: {'; '.join(opt.pros) or '-'}\n- Cons: {'; '.join(opt.cons) or '-'}"
+        )
+    parts.append("## Recommendation")
+    for i, act in enumerate(consensus.recommendation, 1):
+        parts.append(
+            f"{i}. **{act.action}**\n"
+            f"   - Owner: {act.owner}\n"
+            f"   - Deadline: {act.deadline}\n"
+            f"   - Steps: {'; '.join(act.steps) or '-'}\n"
+            f"   - Tools/Resources: {'; '.join(act.tools) or '-'}\n"
+            f"   - Success Metric: {act.success_metric}\n"
+            f"   - Risk & Mitigation: {act.risk_mitigation}"
+        )
+    parts.append("## Risks & Mitigations")
+    parts.append(_bullets([f"{r.risk} — {r.mitigation}" for r in consensus.risks]))
+    parts.append("## Next Steps")
+    parts.append(_bullets(consensus.next_steps))
+    return "\n\n".join(parts)
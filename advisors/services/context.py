@@ -2,13 +2,45 @@
 
 from __future__ import annotations
 
+import hashlib
 import os
-from typing import Dict, List, Tuple
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
 
-try:
-    from duckduckgo_search import DDGS  # type: ignore
-except Exception:  # pragma: no cover - optional dependency
-    DDGS = None
+import httpx
+
+from advisors.services import llm_cache
+
+# The DDGS client's HTML parser is not thread-safe, so shared use is serialised
+_DDGS_LOCK = threading.Lock()
+
+# Search results are kept in the response cache for a day, keyed by the
+# normalised query, so reworded-but-equal agendas and restarts skip the fetch
+_WEB_CACHE_TTL_S = 24 * 60 * 60
+
+
+@lru_cache(maxsize=1)
+def _ddgs_client():
+    # One client, and so one keep-alive connection pool, for every web search.
+    # Imported on first use: the search stack is slow to load and optional
+    try:
+        from duckduckgo_search import DDGS  # type: ignore
+    except Exception:  # pragma: no cover - optional dependency
+        return None
+    return DDGS()
+
+
+def _web_cache_key(category: str, agenda_text: str) -> str:
+    query = f"{category} background for: {agenda_text[:500]}"
+    return llm_cache.make_key("ddgs:lite", [{"role": "user", "content": " ".join(query.lower().split())}])
+
+
+def forget_web_context(category: str, agenda_text: str) -> None:
+    """Drop the stored search results so the next build_web_context fetches afresh."""
+
+    llm_cache.delete(_web_cache_key(category, agenda_text))
 
 
 def build_web_context(category: str, agenda_text: str) -> str:
@@ -18,24 +50,46 @@ def build_web_context(category: str, agenda_text: str) -> str:
     returning an empty string so the caller can gracefully skip the context.
     """
 
-    if DDGS is None:
-        return ""
+    cache_key = _web_cache_key(category, agenda_text)
+    cached = llm_cache.get(cache_key, max_age=_WEB_CACHE_TTL_S)
+    if cached is not None:
+        return cached
     try:
+        # Construction can fail too (e.g. an unsupported browser profile), so it sits in the try
+        ddgs = _ddgs_client()
+        if ddgs is None:
+            return ""
         query = f"{category} background for: {agenda_text[:500]}"
-        bullets: List[str] = []
-        with DDGS() as ddgs:  # free, no API key
-            for result in ddgs.text(query, max_results=5):
-                title = result.get("title") or result.get("href") or ""
-                snippet = (result.get("body") or "").strip()[:300]
-                url = result.get("href") or ""
-                if not (title or snippet):
-                    continue
-                bullets.append(f"- {title}: {snippet} ({url})")
-        return ("Web search highlights:\n" + "\n".join(bullets)) if bullets else ""
+        with _DDGS_LOCK:  # free, no API key
+            # The "lite" backend is a single plain-HTML request, faster than the JS API path
+            results = ddgs.text(query, backend="lite", max_results=5)
+        bullets = [
+            f"- {r.get('title') or r.get('href', '')}: {r.get('body', '').strip()[:300]} ({r.get('href', '')})"
+            for r in results
+            if r.get("title") or r.get("href") or r.get("body", "").strip()
+        ]
+        web_context = ("Web search highlights:\n" + "\n".join(bullets)) if bullets else ""
+        # Empty results are not stored, so a failed or blank search is retried next time
+        llm_cache.set(cache_key, web_context)
+        return web_context
     except Exception:
+        # A DDGS client refuses every call after its first error, so the next
+        # search starts over with a fresh one
+        _ddgs_client.cache_clear()
         return ""
 
 
+@lru_cache(maxsize=1)
+def _eutils_client() -> httpx.Client:
+    # One keep-alive pool for every esearch/esummary round trip, so follow-up
+    # requests skip the TCP and TLS handshakes
+    return httpx.Client(
+        base_url="https://eutils.ncbi.nlm.nih.gov/entrez/eutils/",
+        timeout=20,
+        headers={"User-Agent": "medadvisors/1.0"},
+    )
+
+
 def build_pubmed_context(agenda_text: str, max_results: int = 5) -> Tuple[str, str, Dict, Dict]:
     """Fetch PubMed highlights for the agenda.
 
@@ -44,43 +98,32 @@ def build_pubmed_context(agenda_text: str, max_results: int = 5) -> Tuple[str, s
     """
 
     try:
-        import json as _json
-        from urllib.parse import urlencode, quote_plus as _qp
-        from urllib.request import urlopen as _urlopen
-
         user_q = (agenda_text or "").strip()
         if not user_q:
             return ("", "", {}, {})
 
-        def _esearch(_term: str, _retmax: int) -> Dict:
-            params = {
-                "db": "pubmed",
-                "retmode": "json",
-                "retmax": str(_retmax),
-                "term": _term,
-                "sort": "relevance",
-            }
+        def _eutils(endpoint: str, params: Dict[str, str]) -> Dict:
             api_key = os.environ.get("NCBI_API_KEY")
             if api_key:
                 params["api_key"] = api_key
-            base = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
-            url = f"{base}/esearch.fcgi?{urlencode(params, quote_via=_qp)}"
-            with _urlopen(url, timeout=20) as response:
-                return _json.loads(response.read().decode("utf-8"))
+            response = _eutils_client().get(endpoint, params=params)
+            response.raise_for_status()
+            return response.json()
+
+        def _esearch(_term: str, _retmax: int) -> Dict:
+            return _eutils(
+                "esearch.fcgi",
+                {
+                    "db": "pubmed",
+                    "retmode": "json",
+                    "retmax": str(_retmax),
+                    "term": _term,
+                    "sort": "relevance",
+                },
+            )
 
         def _esummary(_ids: List[str]) -> Dict:
-            esum_params = {
-                "db": "pubmed",
-                "retmode": "json",
-                "id": ",".join(_ids),
-            }
-            api_key = os.environ.get("NCBI_API_KEY")
-            if api_key:
-                esum_params["api_key"] = api_key
-            base = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
-            url = f"{base}/esummary.fcgi?{urlencode(esum_params, quote_via=_qp)}"
-            with _urlopen(url, timeout=20) as response:
-                return _json.loads(response.read().decode("utf-8"))
+            return _eutils("esummary.fcgi", {"db": "pubmed", "retmode": "json", "id": ",".join(_ids)})
 
         # Pass 1: English + recent/systematic filter for precision
         term = f"{user_q} AND (english[la]) AND ((last 5 years[dp]) OR (systematic[sb]))"
@@ -119,3 +162,43 @@ def build_pubmed_context(agenda_text: str, max_results: int = 5) -> Tuple[str, s
         return (term, "\n".join(md_lines), es, esummary)
     except Exception:
         return ("", "", {}, {})
+
+
+def gather_contexts(
+    category: str, agenda_text: str, web_search: bool = True, pubmed: bool = True
+) -> Tuple[str, Tuple[str, str, Dict, Dict]]:
+    """Fetch web highlights and PubMed context concurrently.
+
+    Returns ``(web_context, (query, markdown, esearch, esummary))``; disabled
+    sources come back empty. Both lookups are blocking network I/O, so two
+    threads make the wait ``max(web, pubmed)`` rather than their sum.
+    """
+
+    empty_pubmed: Tuple[str, str, Dict, Dict] = ("", "", {}, {})
+    if not (web_search and pubmed):
+        web_ctx = build_web_context(category, agenda_text) if web_search else ""
+        return web_ctx, (build_pubmed_context(agenda_text) if pubmed else empty_pubmed)
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        web_future = pool.submit(build_web_context, category, agenda_text)
+        pubmed_future = pool.submit(build_pubmed_context, agenda_text)
+        return web_future.result(), pubmed_future.result()
+
+
+def dedupe_contexts(contexts: Iterable[str]) -> Tuple[str, ...]:
+    """Drop empty and repeated context blocks, keeping the first of each in order.
+
+    Blocks that differ only in case or whitespace count as repeats; every copy
+    would otherwise be sent (and billed) in each advisor's prompt.
+    """
+
+    seen = set()
+    unique: List[str] = []
+    for ctx in contexts:
+        normalized = " ".join(ctx.lower().split())
+        if not normalized:
+            continue
+        digest = hashlib.blake2b(normalized.encode("utf-8"), digest_size=16).digest()
+        if digest not in seen:
+            seen.add(digest)
+            unique.append(ctx)
+    return tuple(unique)
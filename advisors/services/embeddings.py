@@ -0,0 +1,61 @@
+"""Embedding helpers shared by the semantic cache and context selection."""
+
+from __future__ import annotations
+
+import math
+from functools import lru_cache
+from operator import mul
+from typing import TYPE_CHECKING, List, Sequence, Tuple
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI, OpenAI
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+
+def normalize(vector: Sequence[float]) -> List[float]:
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+
+def dot(a: Sequence[float], b: Sequence[float]) -> float:
+    """Cosine similarity for vectors that are already L2-normalised."""
+
+    return sum(map(mul, a, b))
+
+
+async def aembed(client: AsyncOpenAI, texts: Sequence[str]) -> List[List[float]]:
+    """Embed ``texts`` in one request and return L2-normalised vectors in input order."""
+
+    if not texts:
+        return []
+    resp = await client.embeddings.create(model=EMBEDDING_MODEL, input=list(texts))
+    ordered = sorted(resp.data, key=lambda item: item.index)
+    return [normalize(item.embedding) for item in ordered]
+
+
+def embed(client: OpenAI, texts: Sequence[str]) -> List[List[float]]:
+    """Synchronous counterpart of :func:`aembed` for code outside an event loop."""
+
+    if not texts:
+        return []
+    resp = client.embeddings.create(model=EMBEDDING_MODEL, input=list(texts))
+    ordered = sorted(resp.data, key=lambda item: item.index)
+    return [normalize(item.embedding) for item in ordered]
+
+
+@lru_cache(maxsize=1024)
+def _embed_text(text: str) -> Tuple[float, ...]:
+    from advisors.services.openai_client import get_openai_client
+
+    return tuple(embed(get_openai_client(), [text])[0])
+
+
+def embed_cached(text: str) -> List[float]:
+    """Embed one text with the shared client, memoised in-process by its exact content.
+
+    The same case text is embedded again by each cache lookup (clarifying
+    questions, meeting reuse), so repeats skip the round trip.
+    """
+
+    return list(_embed_text(text))
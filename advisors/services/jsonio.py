@@ -0,0 +1,38 @@
+"""JSON helpers that use orjson when it is installed and the stdlib otherwise."""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Union
+
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Parse JSON from text or raw bytes (bytes skip a decode step with orjson)."""
+
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, indent: bool = False, sort_keys: bool = False) -> bytes:
+    """Serialise ``obj`` to UTF-8 JSON bytes, optionally pretty-printed with two spaces.
+
+    Compact output has no whitespace in either backend, and ``sort_keys=True``
+    makes it canonical, so the bytes are safe to hash.
+    """
+
+    if orjson is not None:
+        option = (orjson.OPT_INDENT_2 if indent else 0) | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        return orjson.dumps(obj, option=option)
+    return json.dumps(
+        obj,
+        ensure_ascii=False,
+        indent=2 if indent else None,
+        separators=None if indent else (",", ":"),
+        sort_keys=sort_keys,
+    ).encode("utf-8")
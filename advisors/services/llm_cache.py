@@ -0,0 +1,290 @@
+"""On-disk response cache for LLM calls (SQLite, stdlib only).
+
+Two tiers share one database: an exact-match table keyed by a hash of the
+request, and an opt-in semantic table that matches paraphrased prompts by
+embedding similarity. Recent exact-match entries are also kept in a small
+in-process LRU so replays skip SQLite entirely. Exact-match entries are served
+for a day by default, and rows past the longest retention are pruned on write
+so the database stays bounded.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from advisors.services import jsonio
+from advisors.services.embeddings import dot
+
+_LOCK = threading.Lock()
+
+# In-process front for the exact-match table, as key -> (value, ts); guarded by _LOCK
+_MEMORY_MAX_ENTRIES = 512
+_memory: "OrderedDict[str, Tuple[str, int]]" = OrderedDict()
+
+# Completions are sampled, so an exact-match hit older than this counts as a miss
+# unless the caller passes its own max_age
+RESPONSE_TTL_S = 24 * 60 * 60
+
+
+def cache_enabled() -> bool:
+    """Caching is on by default; set ``MEDADVISORS_CACHE=0`` to bypass it."""
+
+    return os.environ.get("MEDADVISORS_CACHE", "1").strip().lower() not in ("0", "false", "no", "off")
+
+
+@dataclass(frozen=True)
+class SemanticCacheConfig:
+    similarity_threshold: float = 0.93
+    ttl: int = 60 * 60 * 24 * 7
+    max_entries: int = 2000
+
+
+SEMANTIC_CACHE = SemanticCacheConfig()
+
+# Rows older than both tiers' default lifetimes are deleted, at most once per interval
+_RETENTION_S = max(RESPONSE_TTL_S, SEMANTIC_CACHE.ttl)
+_PRUNE_INTERVAL_S = 60 * 60
+_last_prune = 0.0
+
+
+def semantic_cache_enabled() -> bool:
+    """Paraphrase matching is opt-in via ``MEDADVISORS_SEMANTIC_CACHE=1``."""
+
+    return cache_enabled() and os.environ.get("MEDADVISORS_SEMANTIC_CACHE", "").strip().lower() in (
+        "1",
+        "true",
+        "yes",
+        "on",
+    )
+
+
+def cache_dir() -> Path:
+    return Path(os.environ.get("MEDADVISORS_CACHE_DIR") or Path.home() / ".medadvisors")
+
+
+@lru_cache(maxsize=1)
+def _connection() -> sqlite3.Connection:
+    path = cache_dir()
+    path.mkdir(parents=True, exist_ok=True)
+    # Shared across Streamlit script threads; writes are serialised by _LOCK
+    conn = sqlite3.connect(str(path / "llm_cache.sqlite"), check_same_thread=False)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL, ts INTEGER NOT NULL)"
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS semantic ("
+        "key TEXT PRIMARY KEY, scope TEXT NOT NULL, embedding TEXT NOT NULL, value TEXT NOT NULL, "
+        "ts INTEGER NOT NULL, hits INTEGER NOT NULL DEFAULT 0)"
+    )
+    conn.commit()
+    return conn
+
+
+def make_key(model_name: str, messages: List[Dict[str, str]]) -> str:
+    # blake2b is faster than sha256 in CPython and 128 bits is ample for cache keys
+    payload = jsonio.dumps([model_name, messages], sort_keys=True)
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def _remember(key: str, value: str, ts: int) -> None:
+    # Caller holds _LOCK
+    _memory[key] = (value, ts)
+    _memory.move_to_end(key)
+    if len(_memory) > _MEMORY_MAX_ENTRIES:
+        _memory.popitem(last=False)
+
+
+def _prune(conn: sqlite3.Connection, now: float) -> None:
+    # Caller holds _LOCK and commits
+    global _last_prune
+    if now - _last_prune < _PRUNE_INTERVAL_S:
+        return
+    _last_prune = now
+    cutoff = int(now) - _RETENTION_S
+    conn.execute("DELETE FROM responses WHERE ts < ?", (cutoff,))
+    conn.execute("DELETE FROM semantic WHERE ts < ?", (cutoff,))
+
+
+def get(key: str, max_age: Optional[int] = RESPONSE_TTL_S) -> Optional[str]:
+    """Return the cached value for ``key``; entries older than ``max_age`` seconds count as misses.
+
+    ``max_age=None`` accepts any age, though rows are pruned after ``_RETENTION_S``.
+    """
+
+    if not cache_enabled():
+        return None
+    try:
+        with _LOCK:
+            entry = _memory.get(key)
+            if entry is None:
+                row = _connection().execute("SELECT value, ts FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    return None
+                entry = (row[0], row[1])
+                _remember(key, *entry)
+            else:
+                _memory.move_to_end(key)
+    except (sqlite3.Error, OSError):
+        return None
+    value, ts = entry
+    if max_age is not None and time.time() - ts > max_age:
+        return None
+    return value
+
+
+def set(key: str, value: str) -> None:
+    if not cache_enabled() or not value:
+        return
+    try:
+        now = time.time()
+        ts = int(now)
+        with _LOCK:
+            _remember(key, value, ts)
+            conn = _connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, ts) VALUES (?, ?, ?)",
+                (key, value, ts),
+            )
+            _prune(conn, now)
+            conn.commit()
+    except (sqlite3.Error, OSError):
+        # A read-only, locked or unreachable cache must never break an advisor run
+        pass
+
+
+def delete(key: str) -> None:
+    """Drop one exact-match entry so the next lookup recomputes it."""
+
+    with _LOCK:
+        _memory.pop(key, None)
+        try:
+            conn = _connection()
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            conn.commit()
+        except (sqlite3.Error, OSError):
+            pass
+
+
+def clear() -> None:
+    """Drop every cached response, in memory and on disk (both tiers)."""
+
+    with _LOCK:
+        _memory.clear()
+        try:
+            conn = _connection()
+            conn.execute("DELETE FROM responses")
+            conn.execute("DELETE FROM semantic")
+            conn.commit()
+        except (sqlite3.Error, OSError):
+            pass
+
+
+def semantic_scope(model_name: str, messages: List[Dict[str, str]], compared: int) -> str:
+    """Hash of everything that must match exactly for a paraphrase hit.
+
+    Only ``messages[compared]`` (the case text) is compared by embedding. The
+    model and every other message (rules, advisor persona, retrieved context,
+    member advice, the closing ask) are part of the scope, so a hit never
+    crosses advisors, evidence or team answers.
+    """
+
+    return make_key(model_name, [m for i, m in enumerate(messages) if i != compared])
+
+
+def semantic_get(
+    scope: str, embedding: Sequence[float], config: SemanticCacheConfig = SEMANTIC_CACHE
+) -> Optional[str]:
+    """Return the stored response whose prompt embedding is closest to ``embedding``.
+
+    Only entries with the same scope, younger than ``config.ttl`` and at least
+    ``config.similarity_threshold`` cosine-similar count as hits.
+    """
+
+    if not semantic_cache_enabled():
+        return None
+    cutoff = int(time.time()) - config.ttl
+    try:
+        with _LOCK:
+            rows = _connection().execute(
+                "SELECT key, embedding, value FROM semantic WHERE scope = ? AND ts >= ? ORDER BY ts DESC LIMIT ?",
+                (scope, cutoff, config.max_entries),
+            ).fetchall()
+    except (sqlite3.Error, OSError):
+        return None
+    best_key, best_value, best_score = None, None, config.similarity_threshold
+    for key, raw_embedding, value in rows:
+        score = dot(embedding, jsonio.loads(raw_embedding))
+        if score >= best_score:
+            best_key, best_value, best_score = key, value, score
+    if best_key is not None:
+        try:
+            with _LOCK:
+                conn = _connection()
+                conn.execute("UPDATE semantic SET hits = hits + 1 WHERE key = ?", (best_key,))
+                conn.commit()
+        except (sqlite3.Error, OSError):
+            pass
+    return best_value
+
+
+def semantic_set(key: str, scope: str, embedding: Sequence[float], value: str) -> None:
+    if not semantic_cache_enabled() or not value:
+        return
+    try:
+        with _LOCK:
+            conn = _connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO semantic (key, scope, embedding, value, ts, hits) VALUES (?, ?, ?, ?, ?, 0)",
+                (key, scope, jsonio.dumps(list(embedding)).decode("utf-8"), value, int(time.time())),
+            )
+            conn.commit()
+    except (sqlite3.Error, OSError):
+        pass
+
+
+def get_or_compute(
+    namespace: str,
+    prompt: str,
+    compute: Callable[[], str],
+    embed: Optional[Callable[[str], Sequence[float]]] = None,
+    config: SemanticCacheConfig = SEMANTIC_CACHE,
+) -> str:
+    """Return the cached response for ``prompt`` within ``namespace``, computing it on a miss.
+
+    The prompt is whitespace/case-normalised first, so trivial edits still hit
+    the exact tier. When the semantic tier is enabled and ``embed`` is given,
+    near-duplicates within the same namespace are reused as well.
+    """
+
+    from openai import APIError
+
+    normalized = " ".join(prompt.lower().split())
+    key = make_key(namespace, [{"role": "user", "content": normalized}])
+    cached = get(key)
+    if cached is not None:
+        return cached
+    embedding = None
+    if embed is not None and semantic_cache_enabled():
+        try:
+            embedding = list(embed(normalized))
+        except APIError:
+            # Embeddings only speed things up; a failure just means a cache miss
+            embedding = None
+        if embedding is not None:
+            cached = semantic_get(namespace, embedding, config)
+            if cached is not None:
+                return cached
+    value = compute()
+    set(key, value)
+    if embedding is not None:
+        semantic_set(key, namespace, embedding, value)
+    return value
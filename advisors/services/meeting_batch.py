@@ -0,0 +1,96 @@
+"""OpenAI Batch API helpers for non-interactive advisor runs.
+
+Batches trade latency (up to the 24h completion window) for lower per-token
+cost and separate rate limits, which suits scheduled reports and eval loops.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Dict, List, Optional
+
+from advisors.services import jsonio
+from advisors.services.openai_client import get_openai_client
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+_TERMINAL_STATUSES = {"completed", "failed", "expired", "cancelled"}
+
+
+def build_batch_jsonl(model_name: str, message_lists: List[List[Dict[str, str]]]) -> bytes:
+    """One request line per message list, tagged ``m0``, ``m1``, ... in input order."""
+
+    lines = [
+        jsonio.dumps(
+            {
+                "custom_id": f"m{i}",
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": {"model": model_name, "messages": messages},
+            }
+        )
+        for i, messages in enumerate(message_lists)
+    ]
+    return b"\n".join(lines) + b"\n"
+
+
+def submit_chat_batch(model_name: str, message_lists: List[List[Dict[str, str]]]) -> str:
+    """Upload ``message_lists`` as one batch job and return its id without waiting."""
+
+    client = get_openai_client()
+    upload = client.files.create(
+        file=("advisor_batch.jsonl", build_batch_jsonl(model_name, message_lists)),
+        purpose="batch",
+    )
+    batch = client.batches.create(
+        input_file_id=upload.id,
+        endpoint=BATCH_ENDPOINT,
+        completion_window="24h",
+    )
+    return batch.id
+
+
+def poll_chat_batch(batch_id: str, num_requests: int) -> Optional[List[str]]:
+    """Return the batch's texts in input order, or ``None`` while it is still running.
+
+    Individual failed requests come back as empty strings (matching the
+    interactive path); a batch that fails or expires as a whole raises.
+    """
+
+    client = get_openai_client()
+    batch = client.batches.retrieve(batch_id)
+    if batch.status not in _TERMINAL_STATUSES:
+        return None
+    if batch.status != "completed" or not batch.output_file_id:
+        raise RuntimeError(f"Batch {batch.id} ended with status {batch.status}")
+
+    outputs: Dict[str, str] = {}
+    for line in client.files.content(batch.output_file_id).text.splitlines():
+        if not line.strip():
+            continue
+        row = jsonio.loads(line)
+        body = ((row.get("response") or {}).get("body")) or {}
+        choices = body.get("choices") or []
+        message = (choices[0].get("message") or {}) if choices else {}
+        outputs[row.get("custom_id", "")] = message.get("content") or ""
+    return [outputs.get(f"m{i}", "") for i in range(num_requests)]
+
+
+def run_chat_batch(
+    model_name: str,
+    message_lists: List[List[Dict[str, str]]],
+    poll_interval: float = 30.0,
+    timeout: Optional[float] = None,
+) -> List[str]:
+    """Submit ``message_lists`` as one batch, wait for it, and return texts in input order."""
+
+    if not message_lists:
+        return []
+    batch_id = submit_chat_batch(model_name, message_lists)
+    started = time.monotonic()
+    while True:
+        texts = poll_chat_batch(batch_id, len(message_lists))
+        if texts is not None:
+            return texts
+        if timeout is not None and time.monotonic() - started > timeout:
+            raise TimeoutError(f"Batch {batch_id} still running after {timeout:.0f}s")
+        time.sleep(poll_interval)
@@ -0,0 +1,186 @@
+"""Exact-match cache for full virtual_lab meetings.
+
+A multi-round meeting costs dozens of model calls, so an identical meeting
+(same agenda, team, questions, rules, contexts and rounds) is answered from the
+response cache instead. The transcripts are stored with the cached summary and
+written under the new session name, so the artifact views keep working even
+after the original session has been pruned. With the semantic tier enabled
+a reworded agenda for the same team and settings can reuse a meeting as well.
+"""
+
+from __future__ import annotations
+
+import shutil
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Sequence, Tuple
+
+from advisors.services import jsonio, llm_cache
+from advisors.services.artifacts import write_atomic
+
+if TYPE_CHECKING:
+    from virtual_lab.agent import Agent
+
+
+def _agent_signature(agent: "Agent") -> Tuple[str, str, str, str, str]:
+    return (agent.title, agent.expertise, agent.goal, agent.role, agent.model)
+
+
+def _hash(signature: Dict[str, Any]) -> str:
+    content = jsonio.dumps(signature, sort_keys=True).decode("utf-8")
+    return llm_cache.make_key("run_meeting", [{"role": "user", "content": content}])
+
+
+def _signature(
+    agenda: str,
+    team_lead: "Agent",
+    team_members: Sequence["Agent"],
+    agenda_questions: Sequence[str],
+    agenda_rules: Sequence[str],
+    contexts: Sequence[str],
+    num_rounds: int,
+    temperature: float,
+    pubmed_search: bool,
+) -> Dict[str, Any]:
+    return {
+        "agenda": agenda,
+        "lead": _agent_signature(team_lead),
+        "members": [_agent_signature(m) for m in team_members],
+        "questions": list(agenda_questions),
+        "rules": list(agenda_rules),
+        "contexts": list(contexts),
+        "rounds": num_rounds,
+        "temperature": temperature,
+        "pubmed": pubmed_search,
+    }
+
+
+def _semantic_scope(signature: Dict[str, Any]) -> str:
+    # Everything but the agenda and the contexts retrieved for it must match exactly
+    return _hash({**signature, "agenda": "", "contexts": []})
+
+
+_TRANSCRIPT_SUFFIXES = (".md", ".json")
+
+
+def _read_transcripts(save_dir: Path, save_name: str) -> Dict[str, str]:
+    transcripts = {}
+    for suffix in _TRANSCRIPT_SUFFIXES:
+        try:
+            transcripts[suffix] = (save_dir / f"{save_name}{suffix}").read_text(encoding="utf-8")
+        except (OSError, UnicodeDecodeError):
+            # The summary is still cached; that transcript view just stays empty on reuse
+            pass
+    return transcripts
+
+
+def _restore_transcripts(entry: Dict[str, Any], save_dir: Path, save_name: str) -> None:
+    if "transcripts" not in entry:
+        # Entries cached before transcripts were stored point at the original session
+        _copy_transcripts(Path(entry["save_dir"]), entry["save_name"], save_dir, save_name)
+        return
+    for suffix, text in entry["transcripts"].items():
+        try:
+            write_atomic(save_dir / f"{save_name}{suffix}", text.encode("utf-8"))
+        except OSError:
+            pass
+
+
+def _copy_transcripts(source_dir: Path, source_name: str, save_dir: Path, save_name: str) -> None:
+    for suffix in _TRANSCRIPT_SUFFIXES:
+        src = source_dir / f"{source_name}{suffix}"
+        dst = save_dir / f"{save_name}{suffix}"
+        if src.exists() and src != dst:
+            try:
+                shutil.copyfile(src, dst)
+            except OSError:
+                # The summary is still returned; only the transcript view goes missing
+                pass
+
+
+def cached_run_meeting(
+    *,
+    agenda: str,
+    save_dir: Path,
+    save_name: str,
+    team_lead: "Agent",
+    team_members: Tuple["Agent", ...],
+    temperature: float,
+    agenda_questions: Tuple[str, ...] = (),
+    agenda_rules: Tuple[str, ...] = (),
+    contexts: Tuple[str, ...] = (),
+    num_rounds: int = 1,
+    pubmed_search: bool = False,
+    reuse: Optional[bool] = None,
+    embed: Optional[Callable[[str], Sequence[float]]] = None,
+    semantic: llm_cache.SemanticCacheConfig = llm_cache.SEMANTIC_CACHE,
+) -> str:
+    """Run a team meeting via ``virtual_lab``, reusing an identical earlier one.
+
+    Sampled meetings are not reproducible, so by default only ``temperature == 0``
+    runs are reused; pass ``reuse=True`` to opt in regardless (or ``False`` to
+    always run). The transcript of a reused meeting is written to ``save_name``.
+    When ``embed`` is given and the semantic tier is enabled, a meeting whose
+    agenda is at least ``semantic.similarity_threshold`` similar also counts.
+    """
+
+    if reuse is None:
+        reuse = temperature == 0
+    signature = _signature(
+        agenda,
+        team_lead,
+        team_members,
+        agenda_questions,
+        agenda_rules,
+        contexts,
+        num_rounds,
+        temperature,
+        pubmed_search,
+    )
+    key, scope = _hash(signature), _semantic_scope(signature)
+    embedding = None
+    if embed is not None and llm_cache.semantic_cache_enabled():
+        from openai import APIError
+
+        try:
+            embedding = list(embed(" ".join(agenda.lower().split())))
+        except APIError:
+            # Embeddings only speed things up; a failure just means no paraphrase match
+            embedding = None
+    if reuse:
+        cached = llm_cache.get(key)
+        if cached is None and embedding is not None:
+            cached = llm_cache.semantic_get(scope, embedding, semantic)
+        if cached is not None:
+            entry = jsonio.loads(cached)
+            _restore_transcripts(entry, save_dir, save_name)
+            return entry["summary"]
+
+    from virtual_lab.run_meeting import run_meeting
+
+    summary = run_meeting(
+        meeting_type="team",
+        agenda=agenda,
+        save_dir=save_dir,
+        save_name=save_name,
+        team_lead=team_lead,
+        team_members=team_members,
+        agenda_questions=agenda_questions,
+        agenda_rules=agenda_rules,
+        contexts=contexts,
+        num_rounds=num_rounds,
+        temperature=temperature,
+        pubmed_search=pubmed_search,
+        return_summary=True,
+    )
+    if summary:
+        entry = {
+            "summary": summary,
+            "save_dir": str(save_dir),
+            "save_name": save_name,
+            "transcripts": _read_transcripts(save_dir, save_name),
+        }
+        value = jsonio.dumps(entry).decode("utf-8")
+        llm_cache.set(key, value)
+        if embedding is not None:
+            llm_cache.semantic_set(key, scope, embedding, value)
+    return summary
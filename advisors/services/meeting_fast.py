@@ -1,65 +1,866 @@
-from typing import Dict, List, Tuple
+import asyncio
+import logging
+import os
+from functools import lru_cache
+from typing import AsyncIterator, Dict, Iterator, List, NamedTuple, Optional, Tuple, Type, Union
+
+from openai import NOT_GIVEN, APIError, AsyncOpenAI, BadRequestError
+from pydantic import BaseModel, ValidationError
 
 from advisors.prompts import ACTIONABILITY_RULE, ADVICE_RULE
-from advisors.services.openai_client import get_openai_client
+from advisors.services import llm_cache
+from advisors.services.consensus import Consensus, render_consensus_markdown
+from advisors.services.embeddings import aembed, dot
+from advisors.services.meeting_batch import run_chat_batch
+from advisors.services.openai_client import create_async_openai_client
+from advisors.services.tokens import count_tokens_batch, truncate_tokens, truncate_tokens_batch
+
+logger = logging.getLogger(__name__)
+
+# Routes every fast-path request to the same provider cache shard so the shared
+# rules/context prefix stays warm across members, the lead, and reruns.
+_PROMPT_CACHE_KEY = "meeting_fast_v1"
+
+# Ops override for the lead-synthesis model, e.g. members on gpt-4.1 and the
+# lead on gpt-4.1-mini: aggregation needs far less reasoning than the members do.
+LEAD_MODEL_ENV = "MEDADVISORS_LEAD_MODEL"
+
+# Rules shared verbatim by members and the lead, rendered once at import
+_RULES_SYSTEM = f"{ADVICE_RULE} {ACTIONABILITY_RULE}"
+
+# Position and prefix of the case turn in every advisor prompt built by _messages
+_AGENDA_TURN = 1
+_AGENDA_PREFIX = "Agenda:\n"
+
+# Upper bound on in-flight requests per fan-out; large teams queue instead of
+# tripping provider rate limits or exhausting the connection pool
+MAX_CONCURRENT_REQUESTS = 16
+
+# Context budget per advisor; larger context sets are pruned per member by relevance
+MAX_CONTEXT_TOKENS = 2000
+
+# Further discussion rounds stop once the consensus stops changing: a round whose
+# synthesis is at least this similar to the previous one ends the meeting
+EARLY_STOP_SIMILARITY = 0.95
+_REFINE_ASK = "Review the consensus draft in your role: correct what is wrong and add what is missing. Be concise."
+
+# The agenda is repeated in all N+1 prompts, so oversized input is capped once up front
+MAX_AGENDA_TOKENS = 1500
+
+# Context documents longer than this are replaced by a short cached summary
+# (keyed by the document text via the response cache); set
+# MEDADVISORS_FULL_CONTEXT=1 to send them verbatim instead.
+FULL_CONTEXT_ENV = "MEDADVISORS_FULL_CONTEXT"
+SUMMARY_THRESHOLD_TOKENS = 1500
+# Summaries come from a cheap model with a hard output cap, independent of the run
+# mode, so switching modes reuses them; MEDADVISORS_SUMMARY_MODEL overrides it
+SUMMARY_MODEL = "gpt-4.1-mini"
+SUMMARY_MODEL_ENV = "MEDADVISORS_SUMMARY_MODEL"
+SUMMARY_MAX_TOKENS = 300
+_SUMMARY_SYSTEM = (
+    "Summarise the document for a clinical advisory team in at most 200 words. Keep findings, "
+    "numbers, dates, drug names and citations; drop navigation text and boilerplate."
+)
+
+
+class _CacheSlot(NamedTuple):
+    key: str
+    scope: str
+    embedding: Optional[List[float]]
+
+
+def _agenda_index(messages: List[Dict[str, str]]) -> Optional[int]:
+    # Advisor prompts carry the case as the agenda turn (see _messages); other
+    # prompts, e.g. document summaries, have none and use the exact tier only
+    if len(messages) > _AGENDA_TURN and messages[_AGENDA_TURN]["content"].startswith(_AGENDA_PREFIX):
+        return _AGENDA_TURN
+    return None
+
+
+async def _cache_lookup(
+    client: AsyncOpenAI, model_name: str, messages: List[Dict[str, str]], refresh: bool = False
+) -> Tuple[Optional[str], _CacheSlot]:
+    # Identical (model, messages) pairs are answered from the local response cache;
+    # with ``refresh`` nothing is served, but the slot still stores the fresh reply
+    key = llm_cache.make_key(model_name, messages)
+    cached = None if refresh else llm_cache.get(key)
+    agenda_index = _agenda_index(messages)
+    if cached is not None or agenda_index is None:
+        return cached, _CacheSlot(key, "", None)
+    # On an exact miss, optionally look for a paraphrase of the case; everything
+    # else (context, member advice, persona) must match exactly via the scope
+    scope = llm_cache.semantic_scope(model_name, messages, agenda_index)
+    embedding = None
+    if llm_cache.semantic_cache_enabled():
+        try:
+            (embedding,) = await aembed(client, [messages[agenda_index]["content"]])
+        except APIError:
+            embedding = None
+        if embedding is not None and not refresh:
+            cached = llm_cache.semantic_get(scope, embedding)
+    return cached, _CacheSlot(key, scope, embedding)
+
+
+def _cache_store(slot: _CacheSlot, text: str) -> None:
+    llm_cache.set(slot.key, text)
+    if slot.embedding is not None:
+        llm_cache.semantic_set(slot.key, slot.scope, slot.embedding, text)
 
 
-def _chat(model_name: str, system: str, user: str) -> str:
-    client = get_openai_client()
-    resp = client.chat.completions.create(
+async def _achat(
+    client: AsyncOpenAI,
+    model_name: str,
+    messages: List[Dict[str, str]],
+    response_format: Optional[Type[BaseModel]] = None,
+    refresh: bool = False,
+    max_tokens: Optional[int] = None,
+) -> str:
+    # Structured replies are cached apart from free-form ones for the same prompt,
+    # and capped replies apart from uncapped ones
+    cache_model = f"{model_name}:{response_format.__name__}" if response_format else model_name
+    if max_tokens is not None:
+        cache_model = f"{cache_model}:max{max_tokens}"
+    cached, slot = await _cache_lookup(client, cache_model, messages, refresh)
+    if cached is not None:
+        return cached
+    if response_format is None:
+        resp = await client.chat.completions.create(
+            model=model_name,
+            messages=messages,
+            prompt_cache_key=_PROMPT_CACHE_KEY,
+            max_tokens=NOT_GIVEN if max_tokens is None else max_tokens,
+        )
+    else:
+        # parse() sends a strict json_schema derived from the pydantic model
+        resp = await client.chat.completions.parse(
+            model=model_name,
+            messages=messages,
+            response_format=response_format,
+            prompt_cache_key=_PROMPT_CACHE_KEY,
+            max_tokens=NOT_GIVEN if max_tokens is None else max_tokens,
+        )
+    text = resp.choices[0].message.content if resp.choices else ""
+    _cache_store(slot, text or "")
+    return text
+
+
+async def _achat_stream(
+    client: AsyncOpenAI, model_name: str, messages: List[Dict[str, str]], refresh: bool = False
+) -> AsyncIterator[str]:
+    """Yield completion text deltas as they arrive (cached responses arrive whole)."""
+
+    cached, slot = await _cache_lookup(client, model_name, messages, refresh)
+    if cached is not None:
+        yield cached
+        return
+    stream = await client.chat.completions.create(
         model=model_name,
-        messages=[
-            {"role": "system", "content": system},
-            {"role": "user", "content": user},
-        ],
+        messages=messages,
+        prompt_cache_key=_PROMPT_CACHE_KEY,
+        stream=True,
     )
-    return resp.choices[0].message.content if resp.choices else ""
+    parts: List[str] = []
+    async for chunk in stream:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+            parts.append(delta)
+            yield delta
+    _cache_store(slot, "".join(parts))
 
 
-def run_fast_completions(
+@lru_cache(maxsize=1024)
+def _persona(title: str, expertise: str, goal: str) -> str:
+    # Teams are reused across meetings, so each advisor's persona is rendered once
+    return f"You are {title}. Expertise: {expertise}. Goal: {goal}."
+
+
+def _messages(persona: str, context_block: str, agenda: str, ask: str) -> List[Dict[str, str]]:
+    # Ordered from most to least stable so the provider prefix cache reaches as far
+    # as possible: the rules never change, the agenda is shared by all N+1 calls of
+    # a meeting, and retrieved context (which may differ per member once pruned)
+    # rides as a user turn after it. Only the persona and ask are advisor-specific.
+    messages = [
+        {"role": "system", "content": _RULES_SYSTEM},
+        {"role": "user", "content": f"{_AGENDA_PREFIX}{agenda}"},
+    ]
+    if context_block:
+        messages.append({"role": "user", "content": f"Shared Context:\n{context_block}"})
+    messages.append({"role": "system", "content": persona})
+    messages.append({"role": "user", "content": ask})
+    return messages
+
+
+async def _select_contexts(
+    client: AsyncOpenAI,
+    contexts: Tuple[str, ...],
+    member_specs: Tuple[Dict[str, str], ...],
+    model_name: str,
+    max_context_tokens: int,
+    lengths: Optional[List[int]] = None,
+) -> Tuple[List[str], str]:
+    """Return (per-member context blocks, lead context block) within the token budget.
+
+    When everything fits, every advisor gets the same full block (best for prefix
+    caching). Otherwise each member keeps the chunks most similar to its goal and
+    expertise, and the lead sees the union of what any member kept.
+    """
+
+    full_block = "\n\n".join(contexts)
+    if lengths is None:
+        lengths = count_tokens_batch(contexts, model_name)
+    if sum(lengths) <= max_context_tokens:
+        return [full_block] * len(member_specs), full_block
+    try:
+        # Chunks and member queries share one embeddings request
+        vecs = await aembed(client, [*contexts, *(f"{m['goal']} {m['expertise']}" for m in member_specs)])
+    except APIError:
+        return [full_block] * len(member_specs), full_block
+    chunk_vecs, query_vecs = vecs[: len(contexts)], vecs[len(contexts) :]
+
+    chosen_by_member: List[List[int]] = []
+    for query in query_vecs:
+        ranked = sorted(range(len(contexts)), key=lambda i: dot(query, chunk_vecs[i]), reverse=True)
+        chosen: List[int] = []
+        used = 0
+        for i in ranked:
+            if used + lengths[i] <= max_context_tokens:
+                chosen.append(i)
+                used += lengths[i]
+        chosen_by_member.append(sorted(chosen))
+
+    member_blocks = ["\n\n".join(contexts[i] for i in chosen) for chosen in chosen_by_member]
+    union = sorted({i for chosen in chosen_by_member for i in chosen})
+    return member_blocks, "\n\n".join(contexts[i] for i in union)
+
+
+def _with_draft(messages: List[Dict[str, str]], draft: str) -> List[Dict[str, str]]:
+    # Later rounds see the previous consensus just before the closing ask
+    if draft:
+        messages.insert(-1, {"role": "user", "content": f"Consensus draft from the previous round:\n{draft}"})
+    return messages
+
+
+def _member_messages(agenda: str, m: Dict[str, str], context_block: str, draft: str = "") -> List[Dict[str, str]]:
+    messages = _messages(
+        _persona(m["title"], m["expertise"], m["goal"]),
+        context_block,
+        agenda,
+        _REFINE_ASK if draft else "Provide your actionable advice now. Be concise.",
+    )
+    return _with_draft(messages, draft)
+
+
+def _lead_messages(
+    agenda: str,
+    lead_spec: Dict[str, str],
+    member_outputs: List[str],
+    context_block: str,
+    structured: bool = False,
+    draft: str = "",
+) -> List[Dict[str, str]]:
+    # The schema already names every field, so structured runs skip the headings request
+    closing = (
+        "Fill in the final consensus fields concisely."
+        if structured
+        else "Think step by step.Produce the final consensus in markdown."
+    )
+    persona = _persona(lead_spec["title"], lead_spec["expertise"], lead_spec["goal"])
+    messages = _with_draft(_messages(persona, context_block, agenda, closing), draft)
+    parts = [f"[member {i+1}]\n{out}" for i, out in enumerate(member_outputs) if out.strip()]
+    if parts:
+        # Member advice rides as its own user turn ahead of the closing instruction
+        messages.insert(-1, {"role": "user", "content": "Team member advice:\n" + "\n\n".join(parts)})
+    return messages
+
+
+def _lone_member_summary(member_outputs: List[str]) -> Optional[str]:
+    """Return a local summary when at most one member answered, else ``None``.
+
+    With a single input the lead would only reformat it, so that round trip is
+    skipped and the advice is passed through as-is.
+    """
+
+    valid = [out for out in member_outputs if out.strip()]
+    if len(valid) > 1:
+        return None
+    logger.info("Skipping lead synthesis: %d of %d members answered", len(valid), len(member_outputs))
+    if not valid:
+        return ""
+    return f"_Only one advisor responded, so no synthesis was needed._\n\n{valid[0]}"
+
+
+async def _summarize_long_contexts(
+    client: AsyncOpenAI, contexts: Tuple[str, ...], model_name: str
+) -> Tuple[str, ...]:
+    if os.environ.get(FULL_CONTEXT_ENV, "").strip().lower() in ("1", "true", "yes", "on"):
+        return contexts
+    lengths = count_tokens_batch(contexts, model_name)
+    long_indices = [i for i, length in enumerate(lengths) if length > SUMMARY_THRESHOLD_TOKENS]
+    if not long_indices:
+        return contexts
+    # Same document -> same messages -> response-cache hit, so each is summarised once
+    summary_model = os.environ.get(SUMMARY_MODEL_ENV) or SUMMARY_MODEL
+    limit = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    summaries = await asyncio.gather(
+        *(
+            _member_reply(
+                client,
+                summary_model,
+                [{"role": "system", "content": _SUMMARY_SYSTEM}, {"role": "user", "content": contexts[i]}],
+                limit,
+                max_tokens=SUMMARY_MAX_TOKENS,
+            )
+            for i in long_indices
+        )
+    )
+    summarized = list(contexts)
+    for i, summary in zip(long_indices, summaries):
+        # A failed summary falls back to the (later truncated) original
+        if summary.strip():
+            summarized[i] = summary
+    return tuple(summarized)
+
+
+class _MemberPlan(NamedTuple):
+    # Distinct member prompts plus, for each, the member indices that share it
+    message_lists: List[List[Dict[str, str]]]
+    owners: List[List[int]]
+    context_block: str
+
+
+async def _plan_members(
+    client: AsyncOpenAI,
+    agenda: str,
+    contexts: Tuple[str, ...],
+    member_specs: Tuple[Dict[str, str], ...],
+    model_name: str,
+    max_context_tokens: int,
+) -> _MemberPlan:
+    if contexts:
+        contexts = await _summarize_long_contexts(client, contexts, model_name)
+        # A single chunk larger than the budget would otherwise never be selected;
+        # the same encode pass yields the lengths used for budgeting
+        cut, lengths = truncate_tokens_batch(contexts, max_context_tokens, model_name)
+        member_contexts, context_block = await _select_contexts(
+            client, tuple(cut), member_specs, model_name, max_context_tokens, lengths
+        )
+    else:
+        member_contexts, context_block = [""] * len(member_specs), ""
+
+    # Identical prompts (e.g. duplicated team entries) are sent once and fanned back out
+    unique: Dict[Tuple[str, ...], List[int]] = {}
+    message_lists: List[List[Dict[str, str]]] = []
+    for i, (m, ctx) in enumerate(zip(member_specs, member_contexts)):
+        messages = _member_messages(agenda, m, ctx)
+        signature = tuple(msg["content"] for msg in messages)
+        if signature not in unique:
+            unique[signature] = []
+            message_lists.append(messages)
+        unique[signature].append(i)
+    return _MemberPlan(message_lists, list(unique.values()), context_block)
+
+
+def _scatter(plan: _MemberPlan, unique_outputs: List[str], num_members: int) -> List[str]:
+    member_outputs = [""] * num_members
+    for indices, text in zip(plan.owners, unique_outputs):
+        for i in indices:
+            member_outputs[i] = text
+    return member_outputs
+
+
+async def _member_reply(
+    client: AsyncOpenAI,
+    model_name: str,
+    messages: List[Dict[str, str]],
+    limit: asyncio.Semaphore,
+    refresh: bool = False,
+    max_tokens: Optional[int] = None,
+) -> str:
+    try:
+        async with limit:
+            return (await _achat(client, model_name, messages, refresh=refresh, max_tokens=max_tokens)) or ""
+    except APIError:
+        # Retries are exhausted by the client; the lead works with the rest
+        return ""
+
+
+class _PanelAdvice(BaseModel):
+    # advice[i] answers for the i-th advisor listed in the panel prompt
+    advice: List[str]
+
+
+async def _run_members_single_call(
+    client: AsyncOpenAI,
+    agenda: str,
+    member_specs: Tuple[Dict[str, str], ...],
+    plan: _MemberPlan,
+    model_name: str,
+    refresh: bool = False,
+) -> Optional[List[str]]:
+    """Ask one completion to answer for every distinct member; ``None`` if unusable.
+
+    All members see the lead's (union) context block here, since a single
+    request cannot carry per-member context selections.
+    """
+
+    roster = "\n".join(
+        f"{j + 1}. " + _persona(m["title"], m["expertise"], m["goal"])
+        for j, m in enumerate(member_specs[owners[0]] for owners in plan.owners)
+    )
+    persona = f"You are a panel of {len(plan.owners)} advisors. Answer separately as each of them:\n{roster}"
+    ask = (
+        "Provide each advisor's actionable advice now, concisely and in their own voice. "
+        "Return one markdown entry per advisor in `advice`, in the order listed."
+    )
+    messages = _messages(persona, plan.context_block, agenda, ask)
+    try:
+        raw = await _achat(client, model_name, messages, response_format=_PanelAdvice, refresh=refresh)
+        advice = _PanelAdvice.model_validate_json(raw or "").advice
+    except (APIError, ValidationError):
+        return None
+    if len(advice) != len(plan.owners) or not all(a.strip() for a in advice):
+        return None
+    return advice
+
+
+async def _run_members(
+    client: AsyncOpenAI,
+    agenda: str,
+    contexts: Tuple[str, ...],
+    member_specs: Tuple[Dict[str, str], ...],
+    model_name: str,
+    max_context_tokens: int,
+    batch_mode: bool = False,
+    single_call: bool = False,
+    member_deadline_s: Optional[float] = None,
+    refresh: bool = False,
+) -> Tuple[List[str], str]:
+    """Run every member concurrently; return (outputs in member order, lead context block).
+
+    With ``member_deadline_s`` the fan-out stops waiting after that many seconds:
+    stragglers are cancelled and left empty, so the lead works with the rest.
+    """
+
+    plan = await _plan_members(client, agenda, contexts, member_specs, model_name, max_context_tokens)
+    if single_call and len(plan.message_lists) > 1:
+        combined = await _run_members_single_call(client, agenda, member_specs, plan, model_name, refresh)
+        if combined is not None:
+            return _scatter(plan, combined, len(member_specs)), plan.context_block
+        logger.info("Single-call member run was unusable; falling back to one request per member")
+    if batch_mode:
+        unique_outputs = await _run_members_batch(client, model_name, plan.message_lists, refresh)
+    elif member_deadline_s is not None and plan.message_lists:
+        limit = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        tasks = [
+            asyncio.create_task(_member_reply(client, model_name, messages, limit, refresh))
+            for messages in plan.message_lists
+        ]
+        done, pending = await asyncio.wait(tasks, timeout=member_deadline_s)
+        for task in pending:
+            task.cancel()
+        if pending:
+            logger.info("Proceeding without %d members that missed the %.0fs deadline", len(pending), member_deadline_s)
+        unique_outputs = [task.result() if task in done else "" for task in tasks]
+    else:
+        # Members are independent, so fan them out concurrently; gather keeps order
+        limit = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        unique_outputs = await asyncio.gather(
+            *(_member_reply(client, model_name, messages, limit, refresh) for messages in plan.message_lists)
+        )
+    return _scatter(plan, list(unique_outputs), len(member_specs)), plan.context_block
+
+
+async def _run_speculative(
+    client: AsyncOpenAI,
     agenda: str,
     contexts: Tuple[str, ...],
     lead_spec: Dict[str, str],
     member_specs: Tuple[Dict[str, str], ...],
     model_name: str,
-    num_rounds: int = 1,
+    max_context_tokens: int,
+    lead_model_name: str,
+    lead_quorum: int,
+    structured: bool,
+    refresh: bool = False,
+) -> Tuple[List[str], str, Optional[str]]:
+    """Run members and start the lead early once ``lead_quorum`` members have answered.
+
+    If the speculative lead finishes before the stragglers, its summary wins and
+    the stragglers are cancelled; if every member lands first, the speculative
+    lead is cancelled and the caller runs the full synthesis as usual. Returns
+    (member outputs, lead context block, speculative summary or ``None``).
+    """
+
+    plan = await _plan_members(client, agenda, contexts, member_specs, model_name, max_context_tokens)
+    unique_outputs = [""] * len(plan.message_lists)
+    limit = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    member_tasks = {
+        asyncio.create_task(_member_reply(client, model_name, messages, limit, refresh)): j
+        for j, messages in enumerate(plan.message_lists)
+    }
+    pending = set(member_tasks)
+    lead_task: Optional["asyncio.Task[str]"] = None
+    speculated = False
+    try:
+        while pending:
+            waiting = (pending | {lead_task}) if lead_task is not None else pending
+            done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+            if lead_task is not None and lead_task in done:
+                try:
+                    summary = lead_task.result()
+                except APIError:
+                    summary = ""
+                lead_task = None
+                if summary:
+                    logger.info("Speculative lead finished before %d straggling members", len(pending))
+                    return _scatter(plan, unique_outputs, len(member_specs)), plan.context_block, summary
+            for task in done & pending:
+                unique_outputs[member_tasks[task]] = task.result()
+                pending.discard(task)
+            answered = sum(1 for out in unique_outputs if out.strip())
+            if pending and not speculated and answered >= max(lead_quorum, 2):
+                speculated = True
+                partial = _scatter(plan, unique_outputs, len(member_specs))
+                lead_messages = _lead_messages(agenda, lead_spec, partial, plan.context_block, structured)
+                lead_task = asyncio.create_task(
+                    _achat(
+                        client,
+                        lead_model_name,
+                        lead_messages,
+                        response_format=Consensus if structured else None,
+                        refresh=refresh,
+                    )
+                )
+    finally:
+        for task in pending:
+            task.cancel()
+        if lead_task is not None:
+            lead_task.cancel()
+    return _scatter(plan, unique_outputs, len(member_specs)), plan.context_block, None
+
+
+async def _run_members_batch(
+    client: AsyncOpenAI, model_name: str, message_lists: List[List[Dict[str, str]]], refresh: bool = False
+) -> List[str]:
+    """Send cache-missing member prompts through the Batch API as a single job."""
+
+    lookups = [await _cache_lookup(client, model_name, messages, refresh) for messages in message_lists]
+    outputs = [cached or "" for cached, _ in lookups]
+    pending = [i for i, (cached, _) in enumerate(lookups) if cached is None]
+    if pending:
+        texts = await asyncio.to_thread(
+            run_chat_batch, model_name, [message_lists[i] for i in pending]
+        )
+        for i, text in zip(pending, texts):
+            outputs[i] = text
+            _cache_store(lookups[i][1], text)
+    return outputs
+
+
+async def _run_further_rounds(
+    client: AsyncOpenAI,
+    agenda: str,
+    lead_spec: Dict[str, str],
+    member_specs: Tuple[Dict[str, str], ...],
+    context_block: str,
+    summary: str,
+    model_name: str,
+    lead_model_name: str,
+    num_rounds: int,
+    early_stop_similarity: float,
+    batch_mode: bool,
+    structured: bool,
+    refresh: bool = False,
 ) -> str:
-    context_block = "\n\n".join(contexts) if contexts else ""
+    """Run rounds 2..``num_rounds``, each refining the previous round's consensus.
 
-    def member_prompt(m: Dict[str, str]) -> Tuple[str, str]:
-        system = (
-            f"You are {m['title']}. Expertise: {m['expertise']}. Goal: {m['goal']}. "
-            f"{ADVICE_RULE} {ACTIONABILITY_RULE}"
+    Members review the draft and the lead re-synthesises; the meeting ends early
+    once a new consensus is at least ``early_stop_similarity`` similar to the
+    one before it. Later rounds give every member the lead's context block.
+    """
+
+    limit = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    for round_no in range(2, num_rounds + 1):
+        message_lists = [_member_messages(agenda, m, context_block, summary) for m in member_specs]
+        if batch_mode:
+            member_outputs = await _run_members_batch(client, model_name, message_lists, refresh)
+        else:
+            member_outputs = await asyncio.gather(
+                *(_member_reply(client, model_name, messages, limit, refresh) for messages in message_lists)
+            )
+        if _lone_member_summary(list(member_outputs)) is not None:
+            logger.info("Stopping after round %d: too few members answered", round_no - 1)
+            break
+        lead_messages = _lead_messages(agenda, lead_spec, list(member_outputs), context_block, structured, summary)
+        revised = await _achat(
+            client, lead_model_name, lead_messages, response_format=Consensus if structured else None, refresh=refresh
         )
-        user = (
-            f"Agenda:\n{agenda}\n\n"
-            + (f"Context:\n{context_block}\n\n" if context_block else "")
-            + "Provide your actionable advice now. Be concise."
+        if not revised:
+            break
+        previous, summary = summary, revised
+        try:
+            prev_vec, cur_vec = await aembed(client, [previous, summary])
+        except APIError:
+            continue
+        if dot(prev_vec, cur_vec) >= early_stop_similarity:
+            logger.info("Consensus stable after round %d of %d; stopping early", round_no, num_rounds)
+            break
+    return summary
+
+
+async def _astream_fast_completions(
+    agenda: str,
+    contexts: Tuple[str, ...],
+    lead_spec: Dict[str, str],
+    member_specs: Tuple[Dict[str, str], ...],
+    model_name: str,
+    max_context_tokens: int,
+    batch_mode: bool,
+    lead_model_name: str,
+    single_call: bool = False,
+    member_deadline_s: Optional[float] = None,
+    refresh: bool = False,
+) -> AsyncIterator[str]:
+    # The client must outlive the generator, so it is opened inside it
+    async with create_async_openai_client() as client:
+        member_outputs, context_block = await _run_members(
+            client,
+            agenda,
+            contexts,
+            member_specs,
+            model_name,
+            max_context_tokens,
+            batch_mode,
+            single_call,
+            member_deadline_s,
+            refresh,
         )
-        return system, user
+        lone = _lone_member_summary(member_outputs)
+        if lone is not None:
+            yield lone or "(No summary generated)"
+            return
+        lead_messages = _lead_messages(agenda, lead_spec, member_outputs, context_block)
+        async for piece in _achat_stream(client, lead_model_name, lead_messages, refresh):
+            yield piece
 
-    # Run members sequentially (could be parallelized by caller if needed)
-    member_outputs: List[str] = []
-    for m in member_specs:
-        sys, usr = member_prompt(m)
+
+async def arun_fast_completions(
+    agenda: str,
+    contexts: Tuple[str, ...],
+    lead_spec: Dict[str, str],
+    member_specs: Tuple[Dict[str, str], ...],
+    model_name: str,
+    num_rounds: int = 1,
+    max_context_tokens: int = MAX_CONTEXT_TOKENS,
+    stream: bool = False,
+    batch_mode: bool = False,
+    lead_model_name: Optional[str] = None,
+    structured: bool = False,
+    lead_quorum: Optional[int] = None,
+    single_call: bool = False,
+    member_deadline_s: Optional[float] = None,
+    early_stop_similarity: float = EARLY_STOP_SIMILARITY,
+    refresh: bool = False,
+) -> Union[str, AsyncIterator[str]]:
+    """Run the fast advisor meeting and return the lead's markdown consensus.
+
+    With ``stream=True`` an async iterator of lead-synthesis text deltas is
+    returned instead; members still run to completion first since only the
+    lead's output is user-visible. ``batch_mode=True`` sends the member prompts
+    through the OpenAI Batch API (cheaper, but may take hours) and is meant for
+    non-interactive runs only. ``lead_model_name`` (or ``MEDADVISORS_LEAD_MODEL``)
+    lets the synthesis step use a cheaper model than the members. With
+    ``structured=True`` the lead fills the typed ``Consensus`` schema, which is
+    rendered to markdown locally; streaming ignores it. ``lead_quorum`` starts
+    the lead speculatively once that many members have answered, trading one
+    possibly wasted lead call for not waiting on a slow straggler.
+    ``single_call=True`` asks one completion to answer for the whole panel
+    (one round trip instead of N), falling back to per-member requests if the
+    reply cannot be parsed; prefer the default when members need long answers.
+    ``member_deadline_s`` caps how long the lead waits on members: any still
+    running by then are cancelled and treated as not having answered.
+    With ``num_rounds > 1`` (non-streaming only) members then review the
+    consensus and the lead revises it, for up to ``num_rounds`` rounds in all,
+    stopping once a revision is ``early_stop_similarity`` similar to the last.
+    ``refresh=True`` asks the model again instead of answering advisor and lead
+    prompts from the response cache, then stores the new replies there.
+    """
+
+    lead_model = lead_model_name or os.environ.get(LEAD_MODEL_ENV) or model_name
+    # Cap once here so every member and the lead reuse the same trimmed agenda
+    agenda = truncate_tokens(agenda, MAX_AGENDA_TOKENS, model_name)
+    if stream:
+        return _astream_fast_completions(
+            agenda,
+            contexts,
+            lead_spec,
+            member_specs,
+            model_name,
+            max_context_tokens,
+            batch_mode,
+            lead_model,
+            single_call,
+            member_deadline_s,
+            refresh,
+        )
+
+    # One client (and connection pool) is shared by every call in this meeting
+    async with create_async_openai_client() as client:
+        speculative = None
+        if lead_quorum and not (batch_mode or single_call):
+            member_outputs, context_block, speculative = await _run_speculative(
+                client,
+                agenda,
+                contexts,
+                lead_spec,
+                member_specs,
+                model_name,
+                max_context_tokens,
+                lead_model,
+                lead_quorum,
+                structured,
+                refresh,
+            )
+        else:
+            member_outputs, context_block = await _run_members(
+                client,
+                agenda,
+                contexts,
+                member_specs,
+                model_name,
+                max_context_tokens,
+                batch_mode,
+                single_call,
+                member_deadline_s,
+                refresh,
+            )
+        if speculative is not None:
+            summary_md = speculative
+        else:
+            lone = _lone_member_summary(member_outputs)
+            if lone is not None:
+                return lone or "(No summary generated)"
+            lead_messages = _lead_messages(agenda, lead_spec, member_outputs, context_block, structured)
+            try:
+                summary_md = await _achat(
+                    client,
+                    lead_model,
+                    lead_messages,
+                    response_format=Consensus if structured else None,
+                    refresh=refresh,
+                )
+            except BadRequestError:
+                if not structured:
+                    raise
+                # Models without structured-output support reject the schema; ask for markdown instead
+                logger.info("Lead model %s rejected the consensus schema; using free-form synthesis", lead_model)
+                structured = False
+                lead_messages = _lead_messages(agenda, lead_spec, member_outputs, context_block)
+                summary_md = await _achat(client, lead_model, lead_messages, refresh=refresh)
+        if num_rounds > 1 and summary_md:
+            summary_md = await _run_further_rounds(
+                client,
+                agenda,
+                lead_spec,
+                member_specs,
+                context_block,
+                summary_md,
+                model_name,
+                lead_model,
+                num_rounds,
+                early_stop_similarity,
+                batch_mode,
+                structured,
+                refresh,
+            )
+    if structured and summary_md:
         try:
-            member_outputs.append(_chat(model_name, sys, usr) or "")
-        except Exception:
-            member_outputs.append("")
-
-    # Lead synthesis
-    lead_system = (
-        f"You are {lead_spec['title']}. Expertise: {lead_spec['expertise']}. Goal: {lead_spec['goal']}. "
-        f"{ACTIONABILITY_RULE}"
-    )
-    members_block = "\n\n".join(
-        f"[member {i+1}]\n{out}" for i, out in enumerate(member_outputs) if out.strip()
-    )
-    lead_user = (
-        f"Agenda:\n{agenda}\n\n"
-        + (f"Context:\n{context_block}\n\n" if context_block else "")
-        + (f"Team member advice:\n{members_block}\n\n" if members_block else "")
-        + "Think step by step.Produce the final consensus in markdown."
-    )
-    summary_md = _chat(model_name, lead_system, lead_user)
+            summary_md = render_consensus_markdown(Consensus.model_validate_json(summary_md))
+        except ValidationError:
+            # A refusal or truncated object is still worth showing verbatim
+            pass
     return summary_md or "(No summary generated)"
+
+
+def run_fast_completions(
+    agenda: str,
+    contexts: Tuple[str, ...],
+    lead_spec: Dict[str, str],
+    member_specs: Tuple[Dict[str, str], ...],
+    model_name: str,
+    num_rounds: int = 1,
+    max_context_tokens: int = MAX_CONTEXT_TOKENS,
+    batch_mode: bool = False,
+    lead_model_name: Optional[str] = None,
+    structured: bool = False,
+    lead_quorum: Optional[int] = None,
+    single_call: bool = False,
+    member_deadline_s: Optional[float] = None,
+    refresh: bool = False,
+) -> str:
+    """Synchronous entry point for callers without a running event loop (Streamlit, CLI)."""
+
+    return asyncio.run(
+        arun_fast_completions(
+            agenda=agenda,
+            contexts=contexts,
+            lead_spec=lead_spec,
+            member_specs=member_specs,
+            model_name=model_name,
+            num_rounds=num_rounds,
+            max_context_tokens=max_context_tokens,
+            batch_mode=batch_mode,
+            lead_model_name=lead_model_name,
+            structured=structured,
+            lead_quorum=lead_quorum,
+            single_call=single_call,
+            member_deadline_s=member_deadline_s,
+            refresh=refresh,
+        )
+    )
+
+
+def stream_fast_completions(
+    agenda: str,
+    contexts: Tuple[str, ...],
+    lead_spec: Dict[str, str],
+    member_specs: Tuple[Dict[str, str], ...],
+    model_name: str,
+    num_rounds: int = 1,
+    max_context_tokens: int = MAX_CONTEXT_TOKENS,
+    lead_model_name: Optional[str] = None,
+    member_deadline_s: Optional[float] = None,
+    refresh: bool = False,
+) -> Iterator[str]:
+    """Synchronous generator of lead-synthesis deltas, e.g. for ``st.write_stream``.
+
+    Drives a private event loop one delta at a time so the caller can render
+    each piece as soon as it arrives.
+    """
+
+    loop = asyncio.new_event_loop()
+    try:
+        pieces = loop.run_until_complete(
+            arun_fast_completions(
+                agenda=agenda,
+                contexts=contexts,
+                lead_spec=lead_spec,
+                member_specs=member_specs,
+                model_name=model_name,
+                num_rounds=num_rounds,
+                max_context_tokens=max_context_tokens,
+                stream=True,
+                lead_model_name=lead_model_name,
+                member_deadline_s=member_deadline_s,
+                refresh=refresh,
+            )
+        )
+        while True:
+            try:
+                yield loop.run_until_complete(pieces.__anext__())
+            except StopAsyncIteration:
+                break
+        loop.run_until_complete(pieces.aclose())
+    finally:
+        loop.run_until_complete(loop.shutdown_asyncgens())
+        loop.close()
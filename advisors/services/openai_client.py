@@ -1,7 +1,24 @@
 """Centralised OpenAI client helpers used across the app."""
 
 from functools import lru_cache
-from openai import OpenAI
+
+import httpx
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+
+# Sized for a full advisor fan-out (lead + members) so concurrent calls reuse
+# warm keep-alive connections instead of queueing for, or re-opening, sockets.
+# Idle sockets are kept for a minute (httpx default: 5s) so connections freed by
+# fast members are still open for the lead and any later rounds of the meeting.
+_HTTP_LIMITS = httpx.Limits(max_connections=32, max_keepalive_connections=32, keepalive_expiry=60.0)
+
+# The SDK retries 429/5xx/connection errors with jittered exponential backoff;
+# a few extra attempts recover a member cheaply instead of rerunning the meeting.
+_MAX_RETRIES = 4
+_TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+
+# Connect failures (refused/reset before a request is sent) are retried at the
+# transport, which is cheaper than a full SDK retry with its backoff sleep.
+_TRANSPORT_RETRIES = 2
 
 
 @lru_cache(maxsize=1)
@@ -14,4 +31,37 @@ def get_openai_client() -> OpenAI:
     setting the API key) occur before the first call into this helper.
     """
 
-    return OpenAI()
+    return OpenAI(
+        max_retries=_MAX_RETRIES,
+        timeout=_TIMEOUT,
+        http_client=DefaultHttpxClient(
+            transport=httpx.HTTPTransport(limits=_HTTP_LIMITS, retries=_TRANSPORT_RETRIES)
+        ),
+    )
+
+
+def create_async_openai_client() -> AsyncOpenAI:
+    """Return a new async OpenAI client for one batch of concurrent calls.
+
+    Async clients hold an httpx pool bound to the event loop that created it, so
+    unlike the sync client it is not cached process-wide. Callers should use it
+    as an async context manager and share it across every request in the batch.
+    """
+
+    return AsyncOpenAI(
+        max_retries=_MAX_RETRIES,
+        timeout=_TIMEOUT,
+        http_client=DefaultAsyncHttpxClient(
+            transport=httpx.AsyncHTTPTransport(limits=_HTTP_LIMITS, retries=_TRANSPORT_RETRIES)
+        ),
+    )
+
+
+def reset_openai_client() -> None:
+    """Drop the cached client so the next call picks up a changed API key.
+
+    The old client is not closed: requests still in flight on it may finish,
+    and its pool is released once the last reference goes away.
+    """
+
+    get_openai_client.cache_clear()
@@ -1,5 +1,6 @@
 """Definitions for advisor run modes with their cost/performance trade-offs."""
 
+import re
 from dataclasses import dataclass
 from typing import Dict
 
@@ -47,3 +48,29 @@ RUN_MODES: Dict[str, RunMode] = {
 
 
 DEFAULT_MODE_KEY = "budget"
+
+
+# Cases shorter than this, without clarifications, rarely gain from a second round
+SHORT_AGENDA_CHARS = 500
+# Labs, vitals and doses make a short case dense enough to keep every round
+_QUANTITY = re.compile(r"\d+(?:\.\d+)?\s*(?:mg|mcg|µg|g|ml|l|mmol|meq|iu|units?|%|bpm|mmhg)?\b", re.IGNORECASE)
+_DENSE_CASE_QUANTITIES = 5
+
+
+def complexity_score(agenda: str) -> int:
+    """Rough case complexity: the number of quantities (labs, vitals, doses) mentioned."""
+
+    return len(_QUANTITY.findall(agenda or ""))
+
+
+def plan_rounds(run_mode: RunMode, agenda: str, has_clarifications: bool) -> int:
+    """Discussion rounds for this case: one for short, simple cases, else the mode's default."""
+
+    text = (agenda or "").strip()
+    if (
+        len(text) < SHORT_AGENDA_CHARS
+        and not has_clarifications
+        and complexity_score(text) < _DENSE_CASE_QUANTITIES
+    ):
+        return 1
+    return run_mode.num_rounds
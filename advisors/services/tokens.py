@@ -0,0 +1,90 @@
+"""Token counting helpers with a graceful fallback when tiktoken is unavailable."""
+
+from __future__ import annotations
+
+import os
+from functools import lru_cache
+from typing import Any, List, Optional, Sequence, Tuple
+
+try:
+    import tiktoken  # type: ignore
+except Exception:  # pragma: no cover - optional dependency
+    tiktoken = None
+
+
+@lru_cache(maxsize=16)
+def _encoding(model_name: str) -> Optional[Any]:
+    # encoding_for_model loads BPE ranks from disk, so resolve it once per model
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model_name)
+    except Exception:
+        try:
+            return tiktoken.get_encoding("o200k_base")
+        except Exception:
+            return None
+
+
+def count_tokens(text: str, model_name: str) -> int:
+    """Return the token length of ``text``; ~4 characters per token without tiktoken."""
+
+    if not text:
+        return 0
+    enc = _encoding(model_name)
+    if enc is None:
+        return (len(text) + 3) // 4
+    return len(enc.encode(text, disallowed_special=()))
+
+
+def count_tokens_batch(texts: Sequence[str], model_name: str) -> List[int]:
+    """Token lengths for many texts; tiktoken encodes them on parallel threads outside the GIL."""
+
+    enc = _encoding(model_name)
+    if enc is None or len(texts) < 2:
+        return [count_tokens(text, model_name) for text in texts]
+    token_lists = enc.encode_batch(list(texts), num_threads=os.cpu_count() or 1, disallowed_special=())
+    return [len(tokens) for tokens in token_lists]
+
+
+def truncate_tokens(text: str, max_tokens: int, model_name: str) -> str:
+    """Return ``text`` cut to at most ``max_tokens`` tokens (unchanged when it already fits)."""
+
+    if max_tokens <= 0:
+        return ""
+    if not text:
+        return text
+    enc = _encoding(model_name)
+    if enc is None:
+        max_chars = max_tokens * 4
+        return text if len(text) <= max_chars else text[:max_chars]
+    tokens = enc.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return enc.decode(tokens[:max_tokens])
+
+
+def truncate_tokens_batch(texts: Sequence[str], max_tokens: int, model_name: str) -> Tuple[List[str], List[int]]:
+    """Cut each text to ``max_tokens`` and return ``(texts, token lengths)`` from one encode pass.
+
+    A cut text is reported as exactly ``max_tokens`` long; re-encoding the decoded
+    prefix can differ by a token at the boundary, which budgeting tolerates.
+    """
+
+    if max_tokens <= 0:
+        return [""] * len(texts), [0] * len(texts)
+    enc = _encoding(model_name)
+    if enc is None:
+        cut = [truncate_tokens(text, max_tokens, model_name) for text in texts]
+        return cut, [count_tokens(text, model_name) for text in cut]
+    token_lists = enc.encode_batch(list(texts), num_threads=os.cpu_count() or 1, disallowed_special=())
+    cut_texts: List[str] = []
+    lengths: List[int] = []
+    for text, tokens in zip(texts, token_lists):
+        if len(tokens) <= max_tokens:
+            cut_texts.append(text)
+            lengths.append(len(tokens))
+        else:
+            cut_texts.append(enc.decode(tokens[:max_tokens]))
+            lengths.append(max_tokens)
+    return cut_texts, lengths
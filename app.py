@@ -1,58 +1,108 @@
+import heapq
 import os
+import re
 import time
 import secrets
-import concurrent.futures
-from collections import defaultdict, deque
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import json
-from typing import Dict, List
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 
 import streamlit as st
 import streamlit.components.v1 as components
-from advisors.prompts import (
-    ACTIONABILITY_RULE,
-    ADVICE_RULE,
-    PROMPT_GOAL_SUFFIX_LEAD,
-    PROMPT_GOAL_SUFFIX_MEMBER,
-)
-from advisors.presets import (
-    CATEGORY_AGENDA_PLACEHOLDER,
-    CATEGORY_EMOJI,
-    CATEGORY_PRESETS,
-    CATEGORY_QUESTIONS,
-    CATEGORY_RULES,
-    CATEGORY_SUBTITLE,
-)
-from advisors.services.context import build_pubmed_context, build_web_context
-from advisors.services.meeting_fast import run_fast_completions
-from advisors.services.openai_client import get_openai_client
-from advisors.services.run_modes import DEFAULT_MODE_KEY, RUN_MODES, RunMode
-from virtual_lab.agent import Agent
-from virtual_lab.run_meeting import run_meeting
+from advisors.prompts import PROMPT_GOAL_SUFFIX_LEAD, PROMPT_GOAL_SUFFIX_MEMBER
+from advisors.presets import CATEGORY_META, CATEGORY_PRESETS
+from advisors.services import jsonio, llm_cache
+from advisors.services.artifacts import write_atomic
+from advisors.services.context import dedupe_contexts, forget_web_context, gather_contexts
+from advisors.services.run_modes import DEFAULT_MODE_KEY, RUN_MODES, RunMode, plan_rounds
+
+if TYPE_CHECKING:
+    from virtual_lab.agent import Agent
 
 BASE_DIR = Path(__file__).resolve().parent
+SAVE_DIR = BASE_DIR / "advisor_meetings"
+# Sessions saved before the rename to advisor_meetings; read-only fallback
+LEGACY_SAVE_DIR = BASE_DIR / "medical_meetings"
 
 # ---- Lightweight rate limiter (in-memory, per session/user) ----
+# Token bucket per user: up to max_calls at once, refilled at max_calls per
+# window. Least recently seen users are evicted past this many, bounding memory
+_RATE_LIMIT_MAX_USERS = 10_000
+
+
+@st.cache_resource
+def _rate_limit_store() -> "OrderedDict[str, List[float]]":
+    # user_id -> [tokens, last refill time]
+    return OrderedDict()
+
+
 @st.cache_resource
-def _rate_limit_store() -> Dict[str, deque]:
-    return defaultdict(lambda: deque(maxlen=100))
+def _rate_limit_lock() -> threading.Lock:
+    # Shared by every session thread; the store is mutated on each check
+    return threading.Lock()
+
 
 def _rate_limit_ok(user_id: str, window_s: int = 60, max_calls: int = 3) -> bool:
     store = _rate_limit_store()
-    now = int(time.time())
-    q = store[user_id]
-    # Drop timestamps outside window
-    while q and now - q[0] >= window_s:
-        q.popleft()
-    if len(q) >= max_calls:
+    now = time.monotonic()
+    with _rate_limit_lock():
+        # The store is ordered by last check, so idle users sit at the front. Anyone
+        # idle for a full window has a refilled bucket, same as a new entry, and is
+        # dropped; this keeps the store to recently active users
+        while store:
+            oldest = next(iter(store.values()))
+            if now - oldest[1] < window_s:
+                break
+            store.popitem(last=False)
+        state = store.get(user_id)
+        if state is None:
+            state = store[user_id] = [float(max_calls), now]
+            if len(store) > _RATE_LIMIT_MAX_USERS:
+                store.popitem(last=False)
+        else:
+            store.move_to_end(user_id)
+        # One arithmetic refill since the last check; monotonic time cannot jump back
+        state[0] = min(float(max_calls), state[0] + (now - state[1]) * max_calls / window_s)
+        state[1] = now
+        if state[0] >= 1.0:
+            state[0] -= 1.0
+            return True
         return False
-    q.append(now)
-    return True
+
+
+@st.cache_resource
+def _chips_html() -> Dict[str, str]:
+    # Presets are static, so the chip markup is built once per process, not per rerun
+    return {
+        cat: " ".join(f"<span class='chip'>{m['title']}</span>" for m in preset["members"])
+        for cat, preset in CATEGORY_PRESETS.items()
+    }
+
+
+@st.cache_resource
+def _preload_meeting_modules() -> threading.Thread:
+    # Once per process, in the background: import the meeting stack (and with it
+    # the OpenAI SDK) that Run imports lazily. Every Run path opens its own client
+    # per meeting, so there is no connection to warm ahead of time; the imports
+    # are the part of the cold start we can take off the click
+    def _preload() -> None:
+        try:
+            import advisors.services.meeting_fast  # noqa: F401
+            import virtual_lab.run_meeting  # noqa: F401
+        except Exception:
+            pass
+
+    thread = threading.Thread(target=_preload, name="meeting-preload", daemon=True)
+    thread.start()
+    return thread
 
 # Icons and subtitles per category for the hero header
 st.set_page_config(page_title="Medical Advisors", page_icon="🩺", layout="wide")
-st.markdown(
-    """
+# Streamlit drops elements that a rerun does not re-emit, so the styles are sent
+# on every run; the literal is a compiled constant, so this costs no string work
+_APP_CSS = """
     <style>
     [data-testid="stHeader"] { display: none; }
     [data-testid="stToolbar"] { display: none !important; }
@@ -71,18 +121,25 @@ st.markdown(
     [data-testid="stDivider"] hr { border: 0 !important; height: 2px !important; background-color: #e8ebf3 !important; width: 100% !important; margin-left: 0 !important; margin-right: 0 !important; }
     [role="separator"] { border: 0 !important; height: 2px !important; background-color: #e8ebf3 !important; width: 100% !important; margin-left: 0 !important; margin-right: 0 !important; }
     </style>
-    """,
-    unsafe_allow_html=True,
-)
+    """
+
+
+@st.cache_resource
+def _head_html(category: str) -> str:
+    # Styles and hero header go out as one markdown element per rerun rather than three
+    meta = CATEGORY_META[category]
+    return (
+        f"{_APP_CSS}<div class='hero-title'>{meta.emoji} Medical Advisors</div>"
+        f"<div class='hero-subtitle'>{meta.subtitle}</div>"
+    )
+
 
 left_h, right_h = st.columns([3, 1])
 with left_h:
     # Advisor Category at top
     selected_category = "Medical"
-    _emoji = CATEGORY_EMOJI.get(selected_category, "🩺")
-    _subtitle = CATEGORY_SUBTITLE.get(selected_category, "Leader‑led expert panel tailored to the domain to deliver a clear, actionable plan.")
-    st.markdown(f"<div class='hero-title'>{_emoji} Medical Advisors</div>", unsafe_allow_html=True)
-    st.markdown(f"<div class='hero-subtitle'>{_subtitle}</div>", unsafe_allow_html=True)
+    _meta = CATEGORY_META[selected_category]
+    st.markdown(_head_html(selected_category), unsafe_allow_html=True)
     st.divider()
 with right_h:
     pass
@@ -111,6 +168,17 @@ with col_cfg:
             os.environ["NCBI_API_KEY"] = st.secrets["NCBI_API_KEY"]
     except Exception:
         _default_api_key = ""
+    _default_api_key = _default_api_key or os.environ.get("OPENAI_API_KEY", "")
+    if _default_api_key:
+        # Export before anything calls get_openai_client(): the client is created
+        # once per process and reused by every request, so it must see the key
+        if os.environ.get("OPENAI_API_KEY") != _default_api_key:
+            # The key changed (e.g. secrets edited while running): rebuild the client
+            from advisors.services.openai_client import reset_openai_client
+
+            reset_openai_client()
+        os.environ["OPENAI_API_KEY"] = _default_api_key
+        _preload_meeting_modules()
 
     mode_keys = list(RUN_MODES.keys())
     default_mode_index = 0
@@ -135,109 +203,162 @@ with col_cfg:
     fast_path = run_mode.fast_path
     cache_outputs = not fast_path
     user_tag = ""
+    force_rerun = st.checkbox(
+        "Force rerun",
+        help="Ask the advisors again instead of reusing a saved answer to the same case.",
+    )
+    meeting_similarity = st.slider(
+        "Reuse meetings at similarity",
+        min_value=0.80,
+        max_value=1.00,
+        value=llm_cache.SEMANTIC_CACHE.similarity_threshold,
+        step=0.01,
+        disabled=fast_path or not llm_cache.semantic_cache_enabled(),
+        help="A reworded case at least this similar to an earlier meeting reuses its result "
+        "(requires MEDADVISORS_SEMANTIC_CACHE=1). Lower reuses more often.",
+    )
+    clear_cache = st.button(
+        "Clear response cache",
+        help="Forget saved model responses so the next run asks the models again.",
+    )
+    refresh_sources = st.button(
+        "Refresh sources",
+        disabled=not (web_search or pubmed_enabled),
+        help="Re-fetch web and PubMed highlights instead of reusing results saved for up to a day.",
+    )
 
 # Removed Load Previous Session UI per user request
 
 ## (captcha UI moved next to Run button)
 
 
+# ----- External context caching -----
+def _normalize_agenda(text: str) -> str:
+    # Both search backends are case-insensitive, so trivial edits share one cache entry
+    return " ".join((text or "").lower().split())
+
+
+@st.cache_data(show_spinner=False, ttl=60 * 60, max_entries=128)
+def cached_contexts(
+    category: str, agenda_normalized: str, web_search: bool, pubmed: bool
+) -> Tuple[str, Tuple[str, str, Dict, Dict]]:
+    return gather_contexts(category, agenda_normalized, web_search=web_search, pubmed=pubmed)
+
+
+@st.cache_resource
+def _prefetch_pool() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="context-prefetch")
+
+
+def _prefetch_contexts(category: str, web_search: bool, pubmed: bool) -> None:
+    # on_change of the case text: start the web/PubMed lookups while the user is
+    # still answering clarifying questions, so Run usually finds them done
+    agenda_normalized = _normalize_agenda(st.session_state.get(f"agenda_text_{category}", ""))
+    if not (agenda_normalized and (web_search or pubmed)):
+        return
+    key = (category, agenda_normalized, web_search, pubmed)
+    pending = st.session_state.get("_ctx_prefetch")
+    if pending is None or pending[0] != key:
+        st.session_state["_ctx_prefetch"] = (key, _prefetch_pool().submit(gather_contexts, *key))
+
+
+def _contexts_for(
+    category: str, agenda: str, web_search: bool, pubmed: bool
+) -> Tuple[str, Tuple[str, str, Dict, Dict]]:
+    key = (category, _normalize_agenda(agenda), web_search, pubmed)
+    pending = st.session_state.get("_ctx_prefetch")
+    if pending is not None and pending[0] == key:
+        return pending[1].result()
+    return cached_contexts(*key)
+
+
+if refresh_sources:
+    cached_contexts.clear()
+    st.session_state.pop("_ctx_prefetch", None)
+    # Web results are also kept on disk for a day; drop this case's entry
+    forget_web_context(
+        selected_category, _normalize_agenda(st.session_state.get(f"agenda_text_{selected_category}", ""))
+    )
+
+
 st.subheader("Case / Problem Description")
 agenda = st.text_area(
     "Describe the case",
-    placeholder=CATEGORY_AGENDA_PLACEHOLDER.get(selected_category, "Describe your case..."),
+    placeholder=_meta.placeholder,
     height=160,
     key=f"agenda_text_{selected_category}",
+    on_change=_prefetch_contexts,
+    args=(selected_category, bool(web_search), bool(pubmed_enabled)),
 )
 st.markdown("</div>", unsafe_allow_html=True)
 
  
 
 
-@st.cache_data(show_spinner=False, ttl=60 * 60 * 24)
-def generate_clarifying_questions(case_text: str, max_questions: int, model_name: str, category: str) -> List[str]:
-    client = get_openai_client()
-    system = (
-        "You are a domain intake assistant for a multi‑agent advisor. Read the user's case description and draft "
-        "concise clarifying questions to remove ambiguity and capture missing critical details for the specified "
-        "domain. Do not answer the questions. Return exactly the requested number of questions, strictly as a "
-        "numbered list (1., 2., 3., …) with no preamble or commentary."
-    )
+_CLARIFY_CACHE = llm_cache.SemanticCacheConfig(similarity_threshold=0.97)
+_MAX_ANSWER_CHARS = 1000
+_WS_RUN = re.compile(r"\s+")
+_CLARIFY_PROMPT_CACHE_KEY = "clarify_v1"
+_CLARIFY_SYSTEM = (
+    "You are a domain intake assistant for a multi‑agent advisor. Read the user's case description and draft "
+    "concise clarifying questions to remove ambiguity and capture missing critical details for the specified "
+    "domain. Do not answer the questions. Return exactly the requested number of questions, strictly as a "
+    "numbered list (1., 2., 3., …) with no preamble or commentary."
+)
+# Numbered or bulleted list items such as "1. ", "2) ", "- ", "• "
+_NUMBERED = re.compile(r"^\s*(?:\d+[.)]|[-•])\s*(.+)$")
+
+
+def _parse_numbered(content: str, max_questions: int) -> List[str]:
+    # Deduplicate (order-preserving) and trim to max
+    items = (m.group(1).strip() for line in content.splitlines() if (m := _NUMBERED.match(line)))
+    return list(dict.fromkeys(q for q in items if q))[:max_questions]
+
+
+def _clarifying_completion(case_text: str, max_questions: int, model_name: str, category: str) -> str:
+    # Stable parts first and the case text last so repeated calls share a cached prefix
     user = (
         f"Domain/category: {category}\n\n"
-        f"Case description:\n\n{case_text}\n\n"
-        f"Return exactly {max_questions} clarifying questions, numbered 1..{max_questions}."
+        f"Return exactly {max_questions} clarifying questions, numbered 1..{max_questions}.\n\n"
+        f"Case description:\n\n{case_text}"
     )
-    resp = client.chat.completions.create(
+    from advisors.services.openai_client import get_openai_client
+
+    resp = get_openai_client().chat.completions.create(
         model=model_name,
         messages=[
-            {"role": "system", "content": system},
+            {"role": "system", "content": _CLARIFY_SYSTEM},
             {"role": "user", "content": user},
         ],
+        prompt_cache_key=_CLARIFY_PROMPT_CACHE_KEY,
     )
-    content = resp.choices[0].message.content if resp.choices else ""
-    # Parse lines that look like numbered items
-    questions: List[str] = []
-    for line in content.splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        # Strip leading numbering like "1. ", "- ", "• "
-        if line[0].isdigit():
-            # remove leading number and dot
-            q = line.split(".", 1)
-            line = q[1].strip() if len(q) > 1 else line
-        if line.startswith(("- ", "• ")):
-            line = line[2:].strip()
-        questions.append(line)
-    # Deduplicate and trim to max
-    uniq: List[str] = []
-    for q in questions:
-        if q and q not in uniq:
-            uniq.append(q)
-    return uniq[:max_questions]
+    return (resp.choices[0].message.content if resp.choices else "") or ""
+
+
+def generate_clarifying_questions(case_text: str, max_questions: int, model_name: str, category: str) -> List[str]:
+    from advisors.services.embeddings import embed_cached
+
+    # Persistent per-category cache; near-identical case texts reuse earlier questions.
+    # Its in-memory tier already serves repeats, so no st.cache_data memo on top:
+    # that would pickle every result and keep answering after "Clear response cache"
+    content = llm_cache.get_or_compute(
+        f"clarify:{category}:{model_name}:{max_questions}",
+        case_text,
+        lambda: _clarifying_completion(case_text, max_questions, model_name, category),
+        embed=embed_cached,
+        config=_CLARIFY_CACHE,
+    )
+    return _parse_numbered(content, max_questions)
 
 # Uncached variant for clarifying questions
 def generate_clarifying_questions_nocache(case_text: str, max_questions: int, model_name: str, category: str) -> List[str]:
-    client = get_openai_client()
-    system = (
-        "You are a domain intake assistant for a multi‑agent advisor. Read the user's case description and draft "
-        "concise clarifying questions to remove ambiguity and capture missing critical details for the specified "
-        "domain. Do not answer the questions. Return exactly the requested number of questions, strictly as a "
-        "numbered list (1., 2., 3., …) with no preamble or commentary."
-    )
-    user = (
-        f"Domain/category: {category}\n\n"
-        f"Case description:\n\n{case_text}\n\n"
-        f"Return exactly {max_questions} clarifying questions, numbered 1..{max_questions}."
-    )
-    resp = client.chat.completions.create(
-        model=model_name,
-        messages=[
-            {"role": "system", "content": system},
-            {"role": "user", "content": user},
-        ],
-    )
-    content = resp.choices[0].message.content if resp.choices else ""
-    questions: List[str] = []
-    for line in content.splitlines():
-        line = line.strip()
-        if not line:
-            continue
-        if line[0].isdigit():
-            q = line.split(".", 1)
-            line = q[1].strip() if len(q) > 1 else line
-        if line.startswith(("- ", "• ")):
-            line = line[2:].strip()
-        questions.append(line)
-    uniq: List[str] = []
-    for q in questions:
-        if q and q not in uniq:
-            uniq.append(q)
-    return uniq[:max_questions]
+    return _parse_numbered(_clarifying_completion(case_text, max_questions, model_name, category), max_questions)
 
 
 # ----- Full meeting caching -----
-def _serialize_agent(agent: Agent) -> Dict[str, str]:
+# virtual_lab, the OpenAI SDK and the meeting services are imported where they
+# are first needed, so a cold process paints the page before loading them
+def _serialize_agent(agent: "Agent") -> Dict[str, str]:
     return {
         "title": agent.title,
         "expertise": agent.expertise,
@@ -247,7 +368,9 @@ def _serialize_agent(agent: Agent) -> Dict[str, str]:
     }
 
 
-def _deserialize_agent(data: Dict[str, str]) -> Agent:
+def _deserialize_agent(data: Dict[str, str]) -> "Agent":
+    from virtual_lab.agent import Agent
+
     return Agent(
         title=data["title"],
         expertise=data["expertise"],
@@ -257,7 +380,96 @@ def _deserialize_agent(data: Dict[str, str]) -> Agent:
     )
 
 
-@st.cache_data(show_spinner=True, ttl=60 * 60 * 24)
+# ----- Fast-path consensus caching -----
+# Whole-task memo for the fast path: identical inputs return the previous
+# consensus without any model calls. Streaming output cannot go through
+# st.cache_data, so finished summaries are stored here once the stream ends.
+_FAST_SUMMARY_TTL_S = 24 * 60 * 60
+_FAST_SUMMARY_MAX_ENTRIES = 64
+# The lead stops waiting on members after this long; a straggler stuck in
+# retries should not hold the whole page hostage
+_MEMBER_DEADLINE_S = 45.0
+
+
+@st.cache_resource
+def _fast_summary_store() -> "OrderedDict[Tuple, Tuple[float, str]]":
+    return OrderedDict()
+
+
+@st.cache_resource
+def _fast_summary_lock() -> threading.Lock:
+    return threading.Lock()
+
+
+def _fast_task_key(
+    agenda: str,
+    contexts: Tuple[str, ...],
+    lead_spec: Dict[str, str],
+    member_specs: Tuple[Dict[str, str], ...],
+    model_name: str,
+    num_rounds: int,
+) -> Tuple:
+    return (
+        _normalize_agenda(agenda),
+        contexts,
+        tuple(sorted(lead_spec.items())),
+        tuple(tuple(sorted(m.items())) for m in member_specs),
+        model_name,
+        num_rounds,
+    )
+
+
+def _fast_summary_get(key: Tuple) -> Optional[str]:
+    store = _fast_summary_store()
+    with _fast_summary_lock():
+        hit = store.get(key)
+        if hit is None:
+            return None
+        if time.monotonic() - hit[0] > _FAST_SUMMARY_TTL_S:
+            del store[key]
+            return None
+        store.move_to_end(key)
+        return hit[1]
+
+
+def _fast_summary_put(key: Tuple, summary: str) -> None:
+    store = _fast_summary_store()
+    with _fast_summary_lock():
+        store[key] = (time.monotonic(), summary)
+        store.move_to_end(key)
+        while len(store) > _FAST_SUMMARY_MAX_ENTRIES:
+            store.popitem(last=False)
+
+
+if clear_cache:
+    # Rate limited like runs: clearing forces every later request back to the API
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = secrets.token_hex(8)
+    _clear_id = (user_tag.strip() or st.session_state.session_id) + ":clear"
+    if _rate_limit_ok(_clear_id, window_s=60, max_calls=1):
+        llm_cache.clear()
+        with _fast_summary_lock():
+            _fast_summary_store().clear()
+        st.toast("Response cache cleared.")
+    else:
+        st.toast("The cache was cleared recently; try again in a minute.")
+
+
+def to_assistants_model(name: str) -> str:
+    # Map gpt-5* selections to an Assistants-supported model
+    n = (name or "").lower()
+    if n.startswith("gpt-5"):
+        return "gpt-4.1-nano"
+    return name
+
+
+@st.cache_resource
+def _ensure_save_dir() -> Path:
+    # Created once per process rather than stat'ed on every run
+    SAVE_DIR.mkdir(parents=True, exist_ok=True)
+    return SAVE_DIR
+
+
 def run_meeting_cached(
     agenda: str,
     agenda_questions: tuple[str, ...],
@@ -268,29 +480,22 @@ def run_meeting_cached(
     team_lead_data: Dict[str, str],
     team_members_data: tuple[Dict[str, str], ...],
     save_name: str,
+    similarity_threshold: float = llm_cache.SEMANTIC_CACHE.similarity_threshold,
+    reuse: bool = True,
 ) -> str:
-    save_dir = BASE_DIR / "advisor_meetings"
-    save_dir.mkdir(parents=True, exist_ok=True)
-    team_lead = _deserialize_agent(team_lead_data)
-    # Parallelize deserialization of members
-    with concurrent.futures.ThreadPoolExecutor(max_workers=min(8, len(team_members_data) or 1)) as pool:
-        team_members = tuple(pool.map(_deserialize_agent, team_members_data))
+    from advisors.services.embeddings import embed_cached
+    from advisors.services.meeting_cache import cached_run_meeting
 
-    # Map gpt-5* selections to an Assistants-supported model
-    def to_assistants_model(name: str) -> str:
-        n = (name or "").lower()
-        if n.startswith("gpt-5"):
-            return "gpt-4.1-nano"
-        return name
-
-    team_lead.model = to_assistants_model(team_lead.model)
-    team_members = tuple(
-        Agent(m.title, m.expertise, m.goal, m.role, to_assistants_model(m.model)) for m in team_members
-    )
-    summary = run_meeting(
-        meeting_type="team",
+    # Freshly deserialized, so the model can be remapped in place
+    team_lead = _deserialize_agent(team_lead_data)
+    team_members = tuple(_deserialize_agent(d) for d in team_members_data)
+    for agent in (team_lead, *team_members):
+        agent.model = to_assistants_model(agent.model)
+    # Persistent and keyed without the session name (unlike an st.cache_data
+    # memo, which saw a fresh save_name every run and so never hit)
+    summary = cached_run_meeting(
         agenda=agenda,
-        save_dir=save_dir,
+        save_dir=_ensure_save_dir(),
         save_name=save_name,
         team_lead=team_lead,
         team_members=team_members,
@@ -300,7 +505,11 @@ def run_meeting_cached(
         num_rounds=num_rounds,
         temperature=1.0,
         pubmed_search=pubmed_search,
-        return_summary=True,
+        # Cached runs are opted in by the run mode, despite sampling at 1.0;
+        # Force rerun still runs the meeting and stores the fresh result
+        reuse=reuse,
+        embed=embed_cached,
+        semantic=llm_cache.SemanticCacheConfig(similarity_threshold=similarity_threshold),
     )
     return summary
 
@@ -312,9 +521,6 @@ if False:
     if not _rate_limit_ok(_user_id, window_s=60, max_calls=3):
         st.error("Rate limit reached. Please wait a minute and try again.")
         st.stop()
-    # Use sidebar key if provided
-    if _default_api_key:
-        os.environ["OPENAI_API_KEY"] = _default_api_key
     if not _default_api_key:
         st.error("Please set your OpenAI API key in the sidebar or .env before generating questions.")
     elif not agenda.strip():
@@ -336,55 +542,70 @@ if False:
 # Advanced settings expander
 # Removed Advanced settings expander
 
-if st.session_state.clarifying_questions:
+@st.fragment
+def _clarifying_answers_section() -> None:
+    # Fragment: typing an answer reruns only this block, not the whole page
     with st.expander("Clarifying Questions (answer to improve precision)", expanded=True):
         for q in st.session_state.clarifying_questions:
             st.session_state.clarifying_answers[q] = st.text_area(q, value=st.session_state.clarifying_answers.get(q, ""), height=70)
 
+
+if st.session_state.clarifying_questions:
+    _clarifying_answers_section()
+
 ## Removed Agenda Questions and Rules sections from UI; defaults applied per category when running.
 
 st.subheader("Advisors — Team Setup")
 
 # Load category preset
-_preset = CATEGORY_PRESETS[selected_category]
+_preset = _meta.preset
 
 # Role chips (compact)
-st.markdown(" ".join([f"<span class='chip'>{m['title']}</span>" for m in _preset["members"]]), unsafe_allow_html=True)
+st.markdown(_chips_html()[selected_category], unsafe_allow_html=True)
 
 # Editable team inside expander
-with st.expander("Edit team", expanded=False):
-    # Team lead inputs
-    lead_title = st.text_input(
-        "Team Lead Title",
-        value=_preset["lead"]["title"],
-        key=f"lead_title_{selected_category}",
-    )
-    lead_expertise = st.text_input(
-        "Team Lead Expertise",
-        value=_preset["lead"]["expertise"],
-        key=f"lead_expertise_{selected_category}",
-    )
-    # Dynamic member inputs
-    member_titles: List[str] = []
-    member_expertises: List[str] = []
-    for idx, m in enumerate(_preset["members"]):
-        c1, c2 = st.columns(2)
-        with c1:
-            member_titles.append(
+@st.fragment
+def _edit_team_section(preset: Dict, category: str) -> None:
+    # Fragment: edits rerun only this block; the run handler reads the values
+    # back from session_state through the widget keys
+    with st.expander("Edit team", expanded=False):
+        # Team lead inputs
+        st.text_input(
+            "Team Lead Title",
+            value=preset["lead"]["title"],
+            key=f"lead_title_{category}",
+        )
+        st.text_input(
+            "Team Lead Expertise",
+            value=preset["lead"]["expertise"],
+            key=f"lead_expertise_{category}",
+        )
+        # Dynamic member inputs
+        for idx, m in enumerate(preset["members"]):
+            c1, c2 = st.columns(2)
+            with c1:
                 st.text_input(
                     f"Member {idx + 1} Title",
                     value=m["title"],
-                    key=f"m{idx}_title_{selected_category}",
+                    key=f"m{idx}_title_{category}",
                 )
-            )
-        with c2:
-            member_expertises.append(
+            with c2:
                 st.text_input(
                     f"Member {idx + 1} Expertise",
                     value=m["expertise"],
-                    key=f"m{idx}_exp_{selected_category}",
+                    key=f"m{idx}_exp_{category}",
                 )
-            )
+
+
+_edit_team_section(_preset, selected_category)
+lead_title = st.session_state.get(f"lead_title_{selected_category}", _preset["lead"]["title"])
+lead_expertise = st.session_state.get(f"lead_expertise_{selected_category}", _preset["lead"]["expertise"])
+member_titles: List[str] = [
+    st.session_state.get(f"m{idx}_title_{selected_category}", m["title"]) for idx, m in enumerate(_preset["members"])
+]
+member_expertises: List[str] = [
+    st.session_state.get(f"m{idx}_exp_{selected_category}", m["expertise"]) for idx, m in enumerate(_preset["members"])
+]
 
 # CAPTCHA UI removed
 # Sticky run bar (always visible)
@@ -397,16 +618,21 @@ run_btn = st.button(
 )
 st.markdown("</div>", unsafe_allow_html=True)
 
-# Keyboard shortcut (Cmd/Ctrl+Enter)
+# Keyboard shortcut (Cmd/Ctrl+Enter). The listener goes on the page itself (the
+# zero-height iframe never has focus) and is registered once per page load; the
+# unchanged html keeps the same iframe across reruns instead of remounting it
 components.html(
     """
     <script>
-    document.addEventListener('keydown', function(e){
-      if ((e.metaKey || e.ctrlKey) && e.key === 'Enter') {
-        const btns = parent.document.querySelectorAll('button[kind=\"primary\"]');
-        if (btns && btns.length) btns[btns.length-1].click();
-      }
-    });
+    if (!parent.window.__mkKb) {
+      parent.window.__mkKb = true;
+      parent.document.addEventListener('keydown', function(e){
+        if ((e.metaKey || e.ctrlKey) && e.key === 'Enter') {
+          const btns = parent.document.querySelectorAll('button[kind=\"primary\"]');
+          if (btns && btns.length) btns[btns.length-1].click();
+        }
+      });
+    }
     </script>
     """,
     height=0,
@@ -414,47 +640,122 @@ components.html(
 
 output_container = st.container()
 
-# Helper to render artifacts for a given session name
+_RESULT_TABS = ["🧭 Consensus", "✅ Next Steps", "🗒️ Transcript", "🧱 Raw JSON", "🔎 Sources"]
+
+
+def _render_sources(pm_query: str, pm_md: str, pm_esearch: Dict, pm_esummary: Dict, web_context_text: str) -> None:
+    # Rendered with the results rather than before the run, so the meeting starts sooner
+    if not (pm_query or web_context_text):
+        st.info("No web or PubMed sources were used for this run.")
+        return
+    if pm_query:
+        st.subheader("PubMed query and highlights")
+        st.code(f"Query: {pm_query}", language="text")
+        if pm_md:
+            st.code(pm_md, language="markdown")
+        with st.expander("Raw ESearch JSON", expanded=False):
+            st.json(pm_esearch)
+        with st.expander("Raw ESummary JSON", expanded=False):
+            st.json(pm_esummary)
+    if web_context_text:
+        st.subheader("Web search highlights (DuckDuckGo)")
+        st.code(web_context_text, language="markdown")
+
+_MAX_STASHED_ARTIFACTS = 5
+
+
+def _stash_artifacts(session_name: str, md_bytes: Optional[bytes], json_bytes: Optional[bytes]) -> None:
+    # Keep the latest runs' artifacts in memory so rendering them skips the disk
+    stash = st.session_state.setdefault("_artifacts", {})
+    stash[session_name] = {"md": md_bytes, "json": json_bytes}
+    while len(stash) > _MAX_STASHED_ARTIFACTS:
+        stash.pop(next(iter(stash)))
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _load_json(path: str, mtime_ns: int):
+    # Keyed on mtime so a rewritten file is parsed again; callers must not mutate the result
+    return jsonio.loads(Path(path).read_bytes())
+
+
+@st.cache_resource(max_entries=16, show_spinner=False)
+def _read_artifact(path: str, mtime_ns: int) -> bytes:
+    # Same mtime keying as _load_json: reruns reuse the bytes until the file changes
+    return Path(path).read_bytes()
+
+
+def _mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+def _artifact_bytes(path: Path) -> Optional[bytes]:
+    mtime_ns = _mtime_ns(path)
+    return None if mtime_ns is None else _read_artifact(str(path), mtime_ns)
+
+
+_JSON_PAGE_SIZE = 50
+
+
+def _render_messages_json(messages, key: str) -> None:
+    # Long message logs are sent to the browser a page at a time, collapsed;
+    # only call this inside a fragment, since paging reruns the caller
+    if not (isinstance(messages, list) and len(messages) > _JSON_PAGE_SIZE):
+        st.json(messages, expanded=False)
+        return
+    pages = -(-len(messages) // _JSON_PAGE_SIZE)
+    page = st.number_input("Page", min_value=1, max_value=pages, value=1, key=key)
+    start = (int(page) - 1) * _JSON_PAGE_SIZE
+    st.caption(f"Messages {start + 1}–{min(start + _JSON_PAGE_SIZE, len(messages))} of {len(messages)}")
+    st.json(messages[start : start + _JSON_PAGE_SIZE], expanded=False)
+
+
+# Helper to render artifacts for a given session name; as a fragment, download
+# clicks rerun only this block instead of the whole script
+@st.fragment
 def render_session_artifacts(session_name: str):
+    # Artifacts written by this session are served from memory; disk is the fallback
+    stashed = st.session_state.get("_artifacts", {}).get(session_name, {})
     # Prefer new advisor_meetings; fallback to medical_meetings
-    save_dir = BASE_DIR / "advisor_meetings"
-    md_path = save_dir / f"{session_name}.md"
-    json_path = save_dir / f"{session_name}.json"
+    md_path = SAVE_DIR / f"{session_name}.md"
+    json_path = SAVE_DIR / f"{session_name}.json"
     if not md_path.exists():
-        old_md = BASE_DIR / "medical_meetings" / f"{session_name}.md"
+        old_md = LEGACY_SAVE_DIR / f"{session_name}.md"
         if old_md.exists():
             md_path = old_md
     if not json_path.exists():
-        old_js = BASE_DIR / "medical_meetings" / f"{session_name}.json"
+        old_js = LEGACY_SAVE_DIR / f"{session_name}.json"
         if old_js.exists():
             json_path = old_js
 
+    # Read each artifact once as bytes: the text is decoded for display and the
+    # original bytes are handed straight to the download buttons
+    md_bytes = stashed.get("md")
+    if md_bytes is None and (md_mtime := _mtime_ns(md_path)) is not None:
+        md_bytes = _read_artifact(str(md_path), md_mtime)
+    md_content = md_bytes.decode("utf-8", errors="replace") if md_bytes is not None else ""
+
     st.subheader("Consensus Summary (from transcript)")
-    if md_path.exists():
-        try:
-            with open(md_path, "r", encoding="utf-8") as f:
-                md_content = f.read()
-            # Heuristic: show the last "### Recommendation" + below when available
-            summary_start = md_content.find("### Recommendation")
-            if summary_start != -1:
-                st.markdown(md_content[summary_start:])
-            else:
-                st.markdown(md_content)
-        except Exception:
-            st.info("Unable to parse summary from transcript; showing full transcript below.")
+    if md_bytes is not None:
+        # Heuristic: show the last "### Recommendation" + below when available
+        summary_start = md_content.find("### Recommendation")
+        if summary_start != -1:
+            st.markdown(md_content[summary_start:])
+        else:
+            st.markdown(md_content)
     else:
         st.info("Transcript (.md) not found.")
 
     st.divider()
     st.subheader("Discussion Transcript")
-    if md_path.exists():
-        with open(md_path, "r", encoding="utf-8") as f:
-            md_content = f.read()
+    if md_bytes is not None:
         with st.expander("Show full markdown transcript", expanded=True):
             st.markdown(md_content)
         st.download_button(
             label="Download transcript (.md)",
-            data=md_content,
+            data=md_bytes,
             file_name=f"{session_name}.md",
             mime="text/markdown",
         )
@@ -462,19 +763,20 @@ def render_session_artifacts(session_name: str):
         st.info("Transcript (.md) not found.")
 
     st.subheader("Raw Messages (JSON)")
-    if json_path.exists():
-        with open(json_path, "r", encoding="utf-8") as f:
-            json_content = f.read()
+    json_bytes = stashed.get("json")
+    json_mtime = _mtime_ns(json_path) if json_bytes is None else None
+    if json_mtime is not None:
+        json_bytes = _read_artifact(str(json_path), json_mtime)
+    if json_bytes is not None:
         try:
-            import json as _json
-            messages = _json.loads(json_content)
+            messages = jsonio.loads(json_bytes) if json_mtime is None else _load_json(str(json_path), json_mtime)
             with st.expander("Show raw messages JSON", expanded=False):
-                st.json(messages)
-        except Exception:
-            st.code(json_content, language="json")
+                _render_messages_json(messages, key=f"json_page_{session_name}")
+        except ValueError:
+            st.code(json_bytes.decode("utf-8", errors="replace"), language="json")
         st.download_button(
             label="Download messages (.json)",
-            data=json_content,
+            data=json_bytes,
             file_name=f"{session_name}.json",
             mime="application/json",
         )
@@ -483,53 +785,61 @@ def render_session_artifacts(session_name: str):
 
 
 # ----- Web session naming and pruning helpers -----
-def _get_web_session_basenames(save_dir: Path) -> list[str]:
-    names = set()
-    for p in list(save_dir.glob("web_*.md")) + list(save_dir.glob("web_*.json")):
-        names.add(p.stem)
-    return sorted(names)
+_WEB_SESSION_FILE = re.compile(r"web_(\d+)\.(?:md|json)$")
 
 
-def _make_next_web_session_name(save_dir: Path) -> str:
-    import re
+def _max_web_session_index(save_dir: Path) -> int:
+    # Single scandir pass over plain names: no Path objects, no set, no sort
     max_idx = 0
-    for stem in _get_web_session_basenames(save_dir):
-        m = re.match(r"web_(\d+)$", stem)
-        if m:
-            try:
-                idx = int(m.group(1))
-                if idx > max_idx:
-                    max_idx = idx
-            except ValueError:
-                pass
-    return f"web_{max_idx + 1:05d}"
+    with os.scandir(save_dir) as it:
+        for entry in it:
+            m = _WEB_SESSION_FILE.match(entry.name)
+            if m:
+                max_idx = max(max_idx, int(m.group(1)))
+    return max_idx
+
+
+@st.cache_resource
+def _session_counter_lock() -> threading.Lock:
+    # Serialises the counter's read-modify-write across concurrent sessions
+    return threading.Lock()
+
+
+def _make_next_web_session_name(save_dir: Path) -> str:
+    # O(1) naming from a persisted counter; the directory is scanned only once,
+    # to seed the counter when it does not exist yet
+    counter_path = save_dir / ".counter"
+    with _session_counter_lock():
+        try:
+            last = int(counter_path.read_text(encoding="utf-8").strip() or "0")
+        except (FileNotFoundError, ValueError):
+            last = _max_web_session_index(save_dir)
+        counter_path.write_text(str(last + 1), encoding="utf-8")
+    return f"web_{last + 1:05d}"
 
 
 def _prune_web_sessions(save_dir: Path, max_sessions: int = 5) -> None:
-    stems = _get_web_session_basenames(save_dir)
-    if len(stems) <= max_sessions:
+    # One scandir pass: DirEntry.stat() reuses data from the directory listing
+    # where the OS provides it, so each file costs at most one stat call
+    files_by_stem: Dict[str, List[str]] = {}
+    mtime_by_stem: Dict[str, float] = {}
+    with os.scandir(save_dir) as it:
+        for entry in it:
+            stem, ext = os.path.splitext(entry.name)
+            if not (stem.startswith("web_") and ext in (".md", ".json")):
+                continue
+            files_by_stem.setdefault(stem, []).append(entry.path)
+            # Last modified time per session (max of md/json)
+            mtime_by_stem[stem] = max(mtime_by_stem.get(stem, 0.0), entry.stat().st_mtime)
+    if len(files_by_stem) <= max_sessions:
         return
-    # Compute last modified time per session (max of md/json)
-    def mtime_for(stem: str) -> float:
-        md = save_dir / f"{stem}.md"
-        js = save_dir / f"{stem}.json"
-        times: list[float] = []
-        if md.exists():
-            times.append(md.stat().st_mtime)
-        if js.exists():
-            times.append(js.stat().st_mtime)
-        return max(times) if times else 0.0
-
-    stems_sorted = sorted(stems, key=mtime_for, reverse=True)
-    to_delete = stems_sorted[max_sessions:]
-    for stem in to_delete:
-        for ext in (".md", ".json"):
-            path = save_dir / f"{stem}{ext}"
-            if path.exists():
-                try:
-                    path.unlink()
-                except Exception:
-                    pass
+    keep = set(heapq.nlargest(max_sessions, files_by_stem, key=mtime_by_stem.__getitem__))
+    for stem in files_by_stem.keys() - keep:
+        for path in files_by_stem[stem]:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
 
 if run_btn:
     # Basic per-user rate limit: 3 req/min
@@ -544,38 +854,27 @@ if run_btn:
     elif not agenda.strip():
         st.error("Please provide a case description (agenda).")
     else:
-        if _default_api_key:
-            os.environ["OPENAI_API_KEY"] = _default_api_key
+        from virtual_lab.agent import Agent
+
         # Build clarifications context
-        clarifications_text = ""
-        if st.session_state.clarifying_questions:
-            qa_lines = ["Clarifications provided by user:"]
-            for cq in st.session_state.clarifying_questions:
-                ans = st.session_state.clarifying_answers.get(cq, "").strip()
-                if ans:
-                    qa_lines.append(f"- {cq}\n  Answer: {ans}")
-                else:
-                    qa_lines.append(f"- {cq}\n  Answer: (not provided)")
-            clarifications_text = "\n".join(qa_lines)
-        # Optional web search context (DuckDuckGo)
-        web_context_text = build_web_context(selected_category, agenda) if web_search else ""
-        # Optional PubMed context based on run mode
-        if pubmed_enabled:
-            pm_query, pm_md, pm_esearch, pm_esummary = build_pubmed_context(agenda)
-        else:
-            pm_query, pm_md, pm_esearch, pm_esummary = "", "", {}, {}
-        if pm_query:
-            with st.expander("PubMed query and highlights", expanded=False):
-                st.code(f"Query: {pm_query}", language="text")
-                if pm_md:
-                    st.code(pm_md, language="markdown")
-                with st.expander("Raw ESearch JSON", expanded=False):
-                    st.json(pm_esearch)
-                with st.expander("Raw ESummary JSON", expanded=False):
-                    st.json(pm_esummary)
-        if web_context_text:
-            with st.expander("Web search highlights (DuckDuckGo)", expanded=False):
-                st.code(web_context_text, language="markdown")
+        # Only answered questions go into the prompts, whitespace-collapsed and
+        # clipped: every member and the lead pay for these tokens
+        answers = st.session_state.clarifying_answers
+        qa_lines = [
+            f"- Q: {cq}\n  A: {_WS_RUN.sub(' ', ans).strip()[:_MAX_ANSWER_CHARS]}"
+            for cq in st.session_state.clarifying_questions
+            if (ans := answers.get(cq) or "").strip()
+        ]
+        clarifications_text = "\n".join(["Clarifications provided by user:", *qa_lines]) if qa_lines else ""
+        # Short, simple cases skip the extra discussion rounds of multi-round modes
+        num_rounds = plan_rounds(run_mode, agenda, bool(qa_lines))
+        # Optional web (DuckDuckGo) and PubMed context, fetched concurrently; usually
+        # already prefetched when the case text was last edited
+        web_context_text, (pm_query, pm_md, pm_esearch, pm_esummary) = _contexts_for(
+            selected_category, agenda, bool(web_search), bool(pubmed_enabled)
+        )
+        # Shared by all three meeting paths; most stable chunk first (see meeting_fast._messages)
+        contexts = dedupe_contexts((pm_md, web_context_text, clarifications_text))
         team_lead = Agent(
             title=lead_title,
             expertise=lead_expertise,
@@ -583,23 +882,19 @@ if run_btn:
             role=_preset["lead"]["role"],
             model=model,
         )
-        # Build members from dynamic inputs while preserving preset goals/roles (parallelized)
-        def _make_member(i: int, m: Dict[str, str]) -> Agent:
-            title_i = member_titles[i] if i < len(member_titles) else m["title"]
-            exp_i = member_expertises[i] if i < len(member_expertises) else m["expertise"]
-            return Agent(
-                title=title_i,
-                expertise=exp_i,
+        # Build members from dynamic inputs while preserving preset goals/roles
+        team_members = tuple(
+            Agent(
+                title=member_titles[i] if i < len(member_titles) else m["title"],
+                expertise=member_expertises[i] if i < len(member_expertises) else m["expertise"],
                 goal=m["goal"] + PROMPT_GOAL_SUFFIX_MEMBER,
                 role=m["role"],
                 model=model,
             )
-        with concurrent.futures.ThreadPoolExecutor(max_workers=min(8, len(_preset["members"]) or 1)) as pool:
-            team_members = tuple(pool.map(lambda idx_m: _make_member(idx_m[0], idx_m[1]), enumerate(_preset["members"])))
-        agenda_qs = tuple(CATEGORY_QUESTIONS[selected_category])
-        agenda_rules = tuple(list(CATEGORY_RULES[selected_category]) + [ACTIONABILITY_RULE, ADVICE_RULE])
-        save_dir = BASE_DIR / "advisor_meetings"
-        save_dir.mkdir(parents=True, exist_ok=True)
+            for i, m in enumerate(_preset["members"])
+        )
+        agenda_qs, agenda_rules = _meta.questions, _meta.rules
+        save_dir = _ensure_save_dir()
         with st.spinner("Running advisors… this usually takes 2–5 minutes"):
             try:
                 # Auto-number session name and prune to keep the latest 5 web_* sessions
@@ -607,7 +902,10 @@ if run_btn:
                 step = st.empty()
                 bar = st.progress(0, text="Configuring advisors…")
                 bar.progress(20, text="Assembling agenda and rules…")
+                messages_obj = None
                 if fast_path:
+                    from advisors.services.meeting_fast import stream_fast_completions
+
                     bar.progress(40, text="Starting fast path (Completions)…")
                     # Build lead/member specs for fast path
                     lead_spec = {
@@ -619,69 +917,82 @@ if run_btn:
                         {"title": m.title, "expertise": m.expertise, "goal": m.goal, "role": m.role}
                         for m in team_members
                     )
-                    summary = run_fast_completions(
-                        agenda=agenda,
-                        contexts=tuple(x for x in (clarifications_text, web_context_text, pm_md) if x),
-                        lead_spec=lead_spec,
-                        member_specs=member_specs,
-                        model_name=model,
-                        num_rounds=int(num_rounds),
+                    task_key = _fast_task_key(
+                        agenda, contexts, lead_spec, member_specs, model, int(num_rounds)
                     )
+                    summary = None if force_rerun else _fast_summary_get(task_key)
+                    # Stream the lead synthesis straight into the Consensus tab as it is
+                    # generated; write_stream returns the full text for the artifacts
+                    tabs = st.tabs(_RESULT_TABS)
+                    with tabs[0]:
+                        st.subheader("Consensus")
+                        if summary is not None:
+                            st.caption("Same inputs as an earlier run; showing its consensus. Tick Force rerun to ask again.")
+                            st.markdown(summary)
+                        else:
+                            summary = st.write_stream(
+                                stream_fast_completions(
+                                    agenda=agenda,
+                                    contexts=contexts,
+                                    lead_spec=lead_spec,
+                                    member_specs=member_specs,
+                                    model_name=model,
+                                    num_rounds=int(num_rounds),
+                                    member_deadline_s=_MEMBER_DEADLINE_S,
+                                    refresh=force_rerun,
+                                )
+                            )
+                            if summary:
+                                _fast_summary_put(task_key, summary)
                     # Save artifacts for fast path so Transcript/Raw JSON tabs work
-                    try:
-                        md_path = save_dir / f"{auto_save_name}.md"
-                        md_content = (
-                            "# Medical Advisors — Transcript (Fast Path)\n\n"
-                            f"## Agenda\n\n{agenda.strip()}\n\n"
-                            + (f"## Clarifications\n\n{clarifications_text}\n\n" if clarifications_text else "")
-                            + (f"## Web highlights\n\n{web_context_text}\n\n" if web_context_text else "")
-                            + "## Consensus Summary\n\n"
-                            + (summary or "(No summary generated)")
-                        )
-                        with open(md_path, "w", encoding="utf-8") as f:
-                            f.write(md_content)
-
-                        json_path = save_dir / f"{auto_save_name}.json"
-                        messages_obj = {
-                            "mode": "fast",
-                            "agenda": agenda,
-                            "clarifications": clarifications_text or "",
-                            "web_context": web_context_text or "",
-                            "pubmed_query": pm_query,
-                            "pubmed_esearch": pm_esearch,
-                            "pubmed_esummary": pm_esummary,
-                            "team_lead": lead_spec,
-                            "team_members": list(member_specs),
-                            "summary_md": summary,
-                        }
-                        with open(json_path, "w", encoding="utf-8") as f:
-                            json.dump(messages_obj, f, ensure_ascii=False, indent=2)
-                    except Exception:
-                        pass
+                    md_parts = ["# Medical Advisors — Transcript (Fast Path)\n\n", "## Agenda\n\n", agenda.strip(), "\n\n"]
+                    if clarifications_text:
+                        md_parts += ["## Clarifications\n\n", clarifications_text, "\n\n"]
+                    if web_context_text:
+                        md_parts += ["## Web highlights\n\n", web_context_text, "\n\n"]
+                    md_parts += ["## Consensus Summary\n\n", summary or "(No summary generated)"]
+                    md_bytes = "".join(md_parts).encode("utf-8")
+                    write_atomic(save_dir / f"{auto_save_name}.md", md_bytes)
+
+                    messages_obj = {
+                        "mode": "fast",
+                        "agenda": agenda,
+                        "clarifications": clarifications_text or "",
+                        "web_context": web_context_text or "",
+                        "pubmed_query": pm_query,
+                        "pubmed_esearch": pm_esearch,
+                        "pubmed_esummary": pm_esummary,
+                        "team_lead": lead_spec,
+                        "team_members": list(member_specs),
+                        "summary_md": summary,
+                    }
+                    json_bytes = jsonio.dumps(messages_obj, indent=True)
+                    write_atomic(save_dir / f"{auto_save_name}.json", json_bytes)
+                    _stash_artifacts(auto_save_name, md_bytes, json_bytes)
                 elif cache_outputs:
                     bar.progress(40, text="Starting cached team meeting…")
                     summary = run_meeting_cached(
                         agenda=agenda,
                         agenda_questions=agenda_qs,
                         agenda_rules=agenda_rules,
-                        contexts=tuple(x for x in (clarifications_text, web_context_text, pm_md) if x),
+                        contexts=contexts,
                         num_rounds=st.session_state.get("num_rounds_override", None) or int(num_rounds),
                         pubmed_search=pubmed_enabled,
                         team_lead_data=_serialize_agent(team_lead),
                         team_members_data=tuple(_serialize_agent(m) for m in team_members),
                         save_name=auto_save_name,
+                        similarity_threshold=meeting_similarity,
+                        reuse=not force_rerun,
                     )
                 else:
-                    # Uncached path mirrors run_meeting_cached; apply same mapping
-                    def to_assistants_model(name: str) -> str:
-                        n = (name or "").lower()
-                        if n.startswith("gpt-5"):
-                            return "gpt-4.1-nano"
-                        return name
-                    team_lead.model = to_assistants_model(team_lead.model)
-                    team_members_live = tuple(
-                        Agent(m.title, m.expertise, m.goal, m.role, to_assistants_model(m.model)) for m in team_members
-                    )
+                    from virtual_lab.run_meeting import run_meeting
+
+                    # Uncached path mirrors run_meeting_cached; every advisor shares the
+                    # run mode's model, so map it once and touch agents only if it changed
+                    live_model = to_assistants_model(model)
+                    if live_model != model:
+                        for agent in (team_lead, *team_members):
+                            agent.model = live_model
                     bar.progress(40, text="Starting live team meeting…")
                     summary = run_meeting(
                         meeting_type="team",
@@ -689,25 +1000,29 @@ if run_btn:
                         save_dir=save_dir,
                         save_name=auto_save_name,
                         team_lead=team_lead,
-                        team_members=team_members_live,
+                        team_members=team_members,
                         agenda_questions=agenda_qs,
                         agenda_rules=agenda_rules,
-                        contexts=tuple(x for x in (clarifications_text, web_context_text, pm_md) if x),
+                        contexts=contexts,
                         num_rounds=st.session_state.get("num_rounds_override", None) or int(num_rounds),
                         temperature=1.0,
                         pubmed_search=pubmed_enabled,
                         return_summary=True,
                     )
+                if not fast_path:
+                    # Read what the meeting wrote once; the tabs below are served from memory
+                    md_bytes = _artifact_bytes(save_dir / f"{auto_save_name}.md")
+                    json_bytes = _artifact_bytes(save_dir / f"{auto_save_name}.json")
+                    _stash_artifacts(auto_save_name, md_bytes, json_bytes)
                 bar.progress(80, text="Summarizing consensus…")
-                _prune_web_sessions(save_dir, max_sessions=5)
+                # Housekeeping only; keep it off the response path
+                threading.Thread(target=_prune_web_sessions, args=(save_dir, 5), daemon=True).start()
                 bar.progress(100, text="Done")
                 # Build a fallback summary from the transcript if the direct summary is empty
                 display_summary = summary or ""
                 try:
-                    md_fallback_path = save_dir / f"{auto_save_name}.md"
-                    if (not display_summary) and md_fallback_path.exists():
-                        with open(md_fallback_path, "r", encoding="utf-8") as _f:
-                            _md = _f.read()
+                    if (not display_summary) and md_bytes:
+                        _md = md_bytes.decode("utf-8", errors="replace")
                         start_idx = -1
                         for _anchor in ("## Consensus Summary", "### Recommendation"):
                             start_idx = _md.find(_anchor)
@@ -716,11 +1031,14 @@ if run_btn:
                         display_summary = _md[start_idx:] if start_idx != -1 else _md
                 except Exception:
                     pass
-                tabs = st.tabs(["🧭 Consensus", "✅ Next Steps", "🗒️ Transcript", "🧱 Raw JSON"]) 
-                # Consensus tab: show synthesized consensus (or fallback)
+                if not fast_path:
+                    tabs = st.tabs(_RESULT_TABS)
+                # Consensus tab: show synthesized consensus (or fallback) unless it was streamed there
                 with tabs[0]:
-                    st.subheader("Consensus")
-                    st.markdown(display_summary or "(No consensus available)")
+                    if not fast_path:
+                        st.subheader("Consensus")
+                    if not (fast_path and summary):
+                        st.markdown(display_summary or "(No consensus available)")
                 # Next Steps tab: extract from display_summary or transcript
                 with tabs[1]:
                     def _extract_next_steps(text: str) -> str:
@@ -737,15 +1055,8 @@ if run_btn:
                         return text[start:]
 
                     next_steps_md = _extract_next_steps(display_summary)
-                    if not next_steps_md:
-                        try:
-                            md_path = BASE_DIR / "advisor_meetings" / f"{auto_save_name}.md"
-                            if md_path.exists():
-                                with open(md_path, "r", encoding="utf-8") as f:
-                                    full_md = f.read()
-                                next_steps_md = _extract_next_steps(full_md)
-                        except Exception:
-                            next_steps_md = ""
+                    if not next_steps_md and md_bytes:
+                        next_steps_md = _extract_next_steps(md_bytes.decode("utf-8", errors="replace"))
                     st.subheader("Next Steps")
                     st.markdown(next_steps_md or "(No next steps found)")
 
@@ -753,18 +1064,18 @@ if run_btn:
                     # Transcript
                     render_session_artifacts(auto_save_name)
                 with tabs[3]:
-                    # Only render JSON section
-                    save_dir = BASE_DIR / "advisor_meetings"
-                    json_path = save_dir / f"{auto_save_name}.json"
-                    if json_path.exists():
-                        with open(json_path, "r", encoding="utf-8") as f:
-                            json_content = f.read()
+                    # Only render JSON section, from what this run wrote or just read
+                    # Collapsed here; the Transcript tab pages through long logs
+                    if messages_obj is not None:
+                        st.json(messages_obj, expanded=False)
+                    elif json_bytes is not None:
                         try:
-                            messages = json.loads(json_content)
-                            st.json(messages)
-                        except Exception:
-                            st.code(json_content, language="json")
+                            st.json(jsonio.loads(json_bytes), expanded=False)
+                        except ValueError:
+                            st.code(json_bytes.decode("utf-8", errors="replace"), language="json")
                     else:
                         st.info("Messages (.json) not found.")
+                with tabs[4]:
+                    _render_sources(pm_query, pm_md, pm_esearch, pm_esummary, web_context_text)
             except Exception as e:
                 st.exception(e)
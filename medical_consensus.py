@@ -11,24 +11,25 @@ from typing import List
 
 from dotenv import load_dotenv
 
-from advisors.prompts import PROMPT_GOAL_SUFFIX_LEAD, PROMPT_GOAL_SUFFIX_MEMBER, ACTIONABILITY_RULE, ADVICE_RULE
-from advisors.presets import (
-    CATEGORY_PRESETS,
-    CATEGORY_QUESTIONS,
-    CATEGORY_RULES,
-)
-from advisors.services.context import build_pubmed_context, build_web_context
+from advisors.prompts import PROMPT_GOAL_SUFFIX_LEAD, PROMPT_GOAL_SUFFIX_MEMBER
+from advisors.presets import CATEGORY_META, CATEGORY_PRESETS
+from advisors.services.artifacts import write_atomic
+from advisors.services.context import dedupe_contexts, gather_contexts
+from advisors.services.meeting_cache import cached_run_meeting
 from advisors.services.meeting_fast import run_fast_completions
-from advisors.services.run_modes import DEFAULT_MODE_KEY, RUN_MODES
+from advisors.services.run_modes import DEFAULT_MODE_KEY, RUN_MODES, plan_rounds
 from virtual_lab.agent import Agent
-from virtual_lab.run_meeting import run_meeting
 
 
 BASE_DIR = Path(__file__).resolve().parent
-load_dotenv(dotenv_path=BASE_DIR / ".env")
-
 SAVE_DIR = BASE_DIR / "medical_meetings"
-SAVE_DIR.mkdir(parents=True, exist_ok=True)
+
+
+def _bootstrap() -> Path:
+    # Called by main() once the arguments parse, so --help and usage errors touch nothing
+    load_dotenv(dotenv_path=BASE_DIR / ".env")
+    SAVE_DIR.mkdir(parents=True, exist_ok=True)
+    return SAVE_DIR
 
 
 def _build_team(category: str, model: str) -> tuple[Agent, tuple[Agent, ...]]:
@@ -90,6 +91,25 @@ def _parse_args() -> argparse.Namespace:
         "--model",
         help="Override the model name used for advisors (defaults to the run mode's model).",
     )
+    parser.add_argument(
+        "--lead-model",
+        help="Model for the fast-path lead synthesis (defaults to MEDADVISORS_LEAD_MODEL, then --model).",
+    )
+    parser.add_argument(
+        "--structured",
+        action="store_true",
+        help="Have the fast-path lead fill a typed consensus schema, rendered to markdown.",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Send fast-path member prompts through the OpenAI Batch API (about half the cost; may take hours).",
+    )
+    parser.add_argument(
+        "--reuse",
+        action="store_true",
+        help="Return the stored result of an identical earlier meeting instead of running it again.",
+    )
     parser.add_argument(
         "--context",
         action="append",
@@ -115,6 +135,7 @@ def _parse_args() -> argparse.Namespace:
 
 def main() -> None:
     args = _parse_args()
+    _bootstrap()
     agenda = _read_agenda(args)
     if not agenda:
         raise SystemExit("Provide an agenda via --agenda, --agenda-file, or stdin.")
@@ -124,27 +145,22 @@ def main() -> None:
 
     run_mode = RUN_MODES[args.mode]
     model = args.model or run_mode.model
-    num_rounds = args.rounds or run_mode.num_rounds
+    num_rounds = args.rounds or plan_rounds(run_mode, agenda, has_clarifications=bool(args.context))
     enable_web = run_mode.enable_web_search and not args.no_web
     enable_pubmed = run_mode.enable_pubmed and not args.no_pubmed
 
     additional_contexts: List[str] = [c.strip() for c in args.context if c.strip()]
-    if enable_web:
-        web_ctx = build_web_context(args.category, agenda)
-        if web_ctx:
-            additional_contexts.append(web_ctx)
-    pm_query = pm_md = ""
-    if enable_pubmed:
-        pm_query, pm_md, _, _ = build_pubmed_context(agenda)
-        if pm_md:
-            additional_contexts.append(pm_md)
+    web_ctx, (pm_query, pm_md, _, _) = gather_contexts(
+        args.category, agenda, web_search=enable_web, pubmed=enable_pubmed
+    )
+    additional_contexts.extend(ctx for ctx in (web_ctx, pm_md) if ctx)
 
     team_lead, team_members = _build_team(args.category, model)
-    agenda_questions = tuple(CATEGORY_QUESTIONS.get(args.category, []))
-    agenda_rules = tuple(list(CATEGORY_RULES.get(args.category, [])) + [ACTIONABILITY_RULE, ADVICE_RULE])
+    meta = CATEGORY_META[args.category]
+    agenda_questions, agenda_rules = meta.questions, meta.rules
     save_name = args.save_name or f"cli_{int(time.time())}"
 
-    contexts_tuple = tuple(ctx for ctx in additional_contexts if ctx)
+    contexts_tuple = dedupe_contexts(additional_contexts)
 
     if run_mode.fast_path:
         lead_spec = {
@@ -163,9 +179,12 @@ def main() -> None:
             member_specs=member_specs,
             model_name=model,
             num_rounds=num_rounds,
+            batch_mode=args.batch,
+            lead_model_name=args.lead_model,
+            structured=args.structured,
         )
-        SAVE_DIR.mkdir(parents=True, exist_ok=True)
-        (SAVE_DIR / f"{save_name}.md").write_text(
+        write_atomic(
+            SAVE_DIR / f"{save_name}.md",
             "\n\n".join(
                 [
                     "# Medical Advisors - Transcript (CLI Fast Path)",
@@ -173,14 +192,12 @@ def main() -> None:
                     *(f"## Context\n\n{ctx}" for ctx in contexts_tuple),
                     "## Consensus Summary\n\n" + (summary or "(No summary generated)"),
                 ]
-            ),
-            encoding="utf-8",
+            ).encode("utf-8"),
         )
         print(summary)
         return
 
-    summary = run_meeting(
-        meeting_type="team",
+    summary = cached_run_meeting(
         agenda=agenda,
         save_dir=SAVE_DIR,
         save_name=save_name,
@@ -192,7 +209,7 @@ def main() -> None:
         num_rounds=num_rounds,
         temperature=0.7,
         pubmed_search=enable_pubmed,
-        return_summary=True,
+        reuse=args.reuse,
     )
     print(summary)
 